@@ -1,6 +1,12 @@
 from Controllers.base_controller import BaseController
 from Controllers.game_flow_controller import GameFlowController
 from Controllers.dino_controller import DinoController
+from Controllers.replay import PRESS, HOLD, RELEASE
+from Controllers.tick_pipeline import TickPipeline
+import time
+
+# Shows and hides the performance overlay (see Views/perf_overlay.py)
+PERF_OVERLAY_KEY = 'p'
 
 class GameController(BaseController):
     def __init__(self, app):
@@ -11,8 +17,28 @@ class GameController(BaseController):
         self.mouseX = 0
         self.mouseY = 0
         self.isMousePressed = False
+        self.tickCount = 0
+        
+        # Every system that advances the game, in the order it runs each tick
+        self.pipeline = TickPipeline()
+        self.pipeline.register("input", "settings reload", self.applyPendingSettings, always=True)
+        self.pipeline.register("input", "game flow", self.updateGameFlow, always=True)
+        if hasattr(self.model, 'registerSystems'):
+            type(self.model).registerSystems(self.pipeline)
+        if hasattr(app, 'perfStats'):
+            self.pipeline.timings = app.perfStats
         
+    def recordInput(self, kind, key):
+        if hasattr(self.app, 'replayRecorder') and self.app.replayRecorder.isRecording:
+            self.app.replayRecorder.record(self.tickCount, kind, key)
+    
     def handleKeyPress(self, key):
+        # Not game input, so it is not recorded either
+        if key == PERF_OVERLAY_KEY:
+            self.togglePerfOverlay()
+            return
+        
+        self.recordInput(PRESS, key)
         super().handleKeyPress(key)
         
         # Game flow controls
@@ -24,13 +50,11 @@ class GameController(BaseController):
         self.dinoController.handleKeyPress(key)
             
     def handleKeyHold(self, keys):
-        """Handle keys being held down"""
+        """Remember the keys being held down; they act (and are recorded) once per tick, see runTick"""
         self.keysPressed = set(keys)
-        
-        # Dino controls
-        self.dinoController.handleKeyHold(self.keysPressed)
     
     def handleKeyRelease(self, key):
+        self.recordInput(RELEASE, key)
         super().handleKeyRelease(key)
         self.dinoController.handleKeyRelease(key)
         
@@ -44,26 +68,76 @@ class GameController(BaseController):
         self.mouseY = mouseY
         self.isMousePressed = False
         
-    def update(self):
-        # Update controllers
-        self.gameFlowController.update()
+    def togglePerfOverlay(self):
+        if hasattr(self.app, 'view'):
+            self.app.view.perfOverlay.toggle()
+    
+    def tick(self):
+        """One fixed-length simulation step (see Controllers/game_loop.py)"""
+        if self.pipeline.timings is not None:
+            start = time.perf_counter()
+            self.runTick()
+            self.pipeline.timings.add("tick", start, time.perf_counter())
+        else:
+            self.runTick()
+    
+    def runTick(self):
+        if hasattr(self.model, 'savePositions'):
+            self.model.savePositions()
         
-        # Update dino controller for animations
-        if hasattr(self, 'dinoController') and hasattr(self.dinoController, 'update'):
-            self.dinoController.update()
+        # Held keys act through the model's "held keys" system, once per tick
+        # however many frames are drawn
+        self.recordInput(HOLD, self.keysPressed)
+        if hasattr(self.model, 'heldKeys'):
+            self.model.heldKeys = set(self.keysPressed)
         
-        # Update game elements when active
-        if not (self.app.isStartScreen or self.app.isPaused or self.app.isGameOver or self.app.isControlsScreen):
-            if hasattr(self.model, 'environment') and hasattr(self.model.environment, 'update'):
-                self.model.environment.update()
-            
-            # Update game model
-            if hasattr(self.model, 'update'):
-                self.model.update()
-
-            # Update score
-            if hasattr(self.model, 'score'):
-                self.model.score += 0.1
+        # Update timer based on game state
+        if (self.app.isStartScreen or self.app.isPaused or self.app.isGameOver or
+                self.app.isLevelComplete or self.app.isControlsScreen):
+            # Update timer at a reduced rate for smoother animations when not active
+            if self.app.timer % 3 == 0:
+                self.app.timer += 1
+        else:
+            self.app.timer += 1
+        
+        if not self.app.isLevelComplete:
+            self.update()
+        self.tickCount += 1
+        
+    def update(self):
+        isActive = not (self.app.isStartScreen or self.app.isPaused or
+                        self.app.isGameOver or self.app.isControlsScreen)
+        if self.pipeline.timings is not None:
+            start = time.perf_counter()
+            self.pipeline.run(self.model, isActive)
+            self.pipeline.timings.add("update", start, time.perf_counter())
+        else:
+            self.pipeline.run(self.model, isActive)
+        
+        # The recording of a run ends with it
+        if ((self.app.isGameOver or self.app.isLevelComplete) and hasattr(self.app, 'replayRecorder')
+                and self.app.replayRecorder.isRecording):
+            self.app.replayRecorder.finish(self.tickCount + 1)
+    
+    def setModel(self, model):
+        """Switch every controller (and the view) over to a new game model"""
+        if self.model is not model and hasattr(self.model, 'releaseObjects'):
+            self.model.releaseObjects()
+        self.model = model
+        self.app.model = model
+        if hasattr(self.app, 'view'):
+            self.app.view.model = model
+        self.gameFlowController.model = model
+        self.dinoController.model = model
+        self.dinoController.dino = model.dino
+    
+    def applyPendingSettings(self, model):
+        # Settings edited while the game runs are swapped in between ticks
+        if hasattr(self.app, 'settingsWatcher'):
+            self.app.settingsWatcher.applyPending(model)
+    
+    def updateGameFlow(self, model):
+        self.gameFlowController.update()
         
     def resetGame(self):
         self.gameFlowController.resetGame()
\ No newline at end of file
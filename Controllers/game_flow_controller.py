@@ -31,6 +31,50 @@ class GameFlowController:
                 self.app.level = 1
                 self.app.selectedLevel = 1
 
+    def startGame(self, seed=None):
+        """Start a new run of the selected level.
+
+        Each run gets its own random seed (or seed, when replaying one) and a
+        fresh model, so the run depends only on the seed, level and inputs.
+        """
+        if hasattr(self.app, 'replayRecorder') and self.app.replayRecorder.isRecording:
+            self.app.replayRecorder.finish(self.controller.tickCount)
+        if hasattr(self.app, 'rng'):
+            seed = self.app.rng.startRun(seed)
+        
+        self.app.isControlsScreen = False
+        self.app.isStartScreen = False
+        self.app.isPaused = False
+        self.app.isGameOver = False
+        self.app.isLevelComplete = False
+        self.app.timer = 0
+        
+        # Set the level from selection
+        self.app.level = self.app.selectedLevel
+        self.controller.setModel(type(self.app.model)(self.app))
+        model = self.app.model
+        
+        # Update obstacle manager for the selected level
+        if hasattr(model, 'obstacleManager'):
+            model.obstacleManager.updateLevel(self.app.level)
+        
+        # Reset enemy manager if in battle mode
+        if self.app.level == 2 and hasattr(model, 'enemyManager'):
+            model.enemyManager.reset_enemies()
+        
+        # Ensure dino is in running state
+        if hasattr(model, 'dino'):
+            model.dino.isRunning = True
+            model.dino.isIdle = False
+            model.dino.health = model.dino.maxHealth  # Reset health
+
+        # Reset score
+        model.score = 0
+        model.runRecorded = False
+        
+        if hasattr(self.app, 'replayRecorder') and hasattr(self.app, 'rng'):
+            self.app.replayRecorder.start(self.app.level, seed, self.controller.tickCount)
+
     def handlePause(self, key):
         if key == 'esc':
             self.app.isPaused = not self.app.isPaused
@@ -48,14 +92,7 @@ class GameFlowController:
         self.app.timer = 0
         
         # Create a new model instance with the current level
-        self.controller.model = type(self.model)(self.app)
-        self.app.model = self.controller.model
-        self.app.view.model = self.controller.model
-        
-        # Reset the dino controller
-        self.controller.dinoController.model = self.controller.model
-        self.controller.dinoController.dino = self.controller.model.dino
-        self.model = self.controller.model
+        self.controller.setModel(type(self.model)(self.app))
         
         # Reset the score
         self.controller.model.score = 0
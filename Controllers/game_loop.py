@@ -0,0 +1,56 @@
+import time
+
+# The game was tuned at 30 steps per second: gravity, speeds and every
+# timer count ticks at this rate, however often the screen is redrawn
+TICK_RATE = 30
+
+# Most ticks run to catch up in one frame; time beyond that is dropped so a
+# long stall (loading, dragging the window) does not fast-forward the game
+MAX_TICKS_PER_FRAME = 5
+
+class FixedTimestepLoop:
+    """Runs the simulation at a fixed rate, independent of the frame rate.
+
+    advance() is called once per rendered frame. Real time since the last
+    frame goes into an accumulator and tick() is called once for every full
+    tick it holds, so a late frame runs several ticks and an early one none.
+    What is left over becomes alpha, the fraction of a tick the frame is
+    past the last one, which drawing uses to interpolate positions.
+    """
+    def __init__(self, tick, tickRate=TICK_RATE, maxTicksPerFrame=MAX_TICKS_PER_FRAME,
+                 clock=time.perf_counter):
+        self.tick = tick
+        self.tickLength = 1 / tickRate
+        self.maxTicksPerFrame = maxTicksPerFrame
+        self.clock = clock
+        self.lastTime = None
+        self.accumulator = 0
+        self.alpha = 1.0
+        self.ticks = 0
+        self.droppedTime = 0
+
+    def advance(self):
+        """Run the ticks that are due, returns how many ran"""
+        now = self.clock()
+        if self.lastTime is None:
+            # First frame: run one tick so the game starts moving right away
+            self.lastTime = now
+            self.accumulator = self.tickLength
+        self.accumulator += now - self.lastTime
+        self.lastTime = now
+
+        maxBacklog = self.maxTicksPerFrame * self.tickLength
+        if self.accumulator > maxBacklog:
+            self.droppedTime += self.accumulator - maxBacklog
+            self.accumulator = maxBacklog
+
+        # The epsilon keeps float rounding from leaving a whole tick for the next frame
+        ticks = 0
+        while self.accumulator >= self.tickLength - 1e-9:
+            self.tick()
+            self.accumulator -= self.tickLength
+            ticks += 1
+        self.ticks += ticks
+
+        self.alpha = max(0.0, self.accumulator / self.tickLength)
+        return ticks
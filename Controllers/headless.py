@@ -0,0 +1,223 @@
+"""Headless simulation: the game logic without a window or sound.
+
+    python main.py --headless --level 1 --ticks 100000 --seed 7
+    python main.py --headless --replay data/replays/<file>.replay
+
+Runs the same controller update onStep does, as fast as it can, and
+restarts the level whenever a run ends. Nothing is drawn, no sprite is
+decoded and the saved high score and ranking are left untouched, so it
+can be used for soak tests and balancing runs, or to play a recorded run
+back at full speed.
+"""
+from Controllers.replay import Replay, ReplayPlayer
+from Controllers.tick_pipeline import checkSingleAdvance
+from Models.log import DEBUG, gameLog
+from Models.pool import getPoolStats
+from Models.rng import RngService
+import argparse
+import atexit
+import contextlib
+import hashlib
+import os
+import time
+
+class HeadlessApp:
+    """Stands in for the cmu_graphics app, with the same game state"""
+    def __init__(self, level, width=800, height=600, obstacleBackend="objects"):
+        from Models.graphics import Sound
+
+        self.width = width
+        self.height = height
+        self.timer = 0
+        self.isHeadless = True
+        self.obstacleBackend = obstacleBackend
+
+        self.isStartScreen = True
+        self.isPaused = False
+        self.isGameOver = False
+        self.isLevelComplete = False
+        self.isControlsScreen = False
+        # Like the real app: models are built at level 1, startGame switches
+        self.level = 1
+        self.selectedLevel = level
+        self.groundY = height - 30
+
+        self.meteorSound = Sound("assets/meteor.mp3")
+
+    def initNewGame(self):
+        self.controller.gameFlowController.startGame()
+
+def hashState(digest, app):
+    """Fold the state that matters for gameplay into digest.
+
+    Obstacles go in by their type, not their class, and positions as
+    plain floats (the arrays backend has NumPy ones), so both obstacle
+    backends give the same digest for the same run.
+    """
+    state = [app.timer, round(app.model.score, 6), app.isGameOver, app.isLevelComplete]
+    for entity in app.model.getEntities():
+        name = entity.type if hasattr(entity, 'type') else type(entity).__name__
+        state.append((name, float(entity.x), float(entity.y)))
+    digest.update(repr(state).encode())
+
+def createApp(level, seed=None, obstacleBackend="objects"):
+    from Models.game_model import GameModelManager
+    from Controllers.game_controller import GameController
+
+    app = HeadlessApp(level, obstacleBackend=obstacleBackend)
+    app.rng = RngService(seed)
+    app.model = GameModelManager(app)
+    app.controller = GameController(app)
+    return app
+
+@contextlib.contextmanager
+def quiet(verbose):
+    """The models log a lot while playing; show all of it only when asked"""
+    if verbose:
+        levels = gameLog.getState()
+        gameLog.setLevel(DEBUG)
+        try:
+            yield
+        finally:
+            gameLog.setState(levels)
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+def runHeadless(level=1, ticks=100000, seed=None, verbose=False, checkTicks=False, digestState=False,
+                obstacleBackend="objects"):
+    """Simulate ticks steps of level and return a summary dict.
+
+    With checkTicks, every tick is also checked to advance each entity
+    exactly once; the offending ticks are returned under "tickErrors".
+    With digestState, the state after every tick is hashed into "stateDigest",
+    so two runs with the same seed can be compared tick for tick.
+    """
+    runs = 0
+    scores = []
+    tickErrors = []
+    digest = hashlib.sha256()
+    start = time.perf_counter()
+
+    with quiet(verbose):
+        app = createApp(level, seed, obstacleBackend)
+        app.initNewGame()
+
+        for tick in range(ticks):
+            if checkTicks:
+                for entity, advanced in checkSingleAdvance(app.model, app.controller.tick):
+                    tickErrors.append((tick, type(entity).__name__, advanced))
+            else:
+                app.controller.tick()
+            if digestState:
+                hashState(digest, app)
+
+            if app.isGameOver or app.isLevelComplete:
+                runs += 1
+                scores.append(int(app.model.score))
+                app.initNewGame()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "ticks": ticks,
+        "seconds": elapsed,
+        "ticksPerSecond": ticks / elapsed if elapsed > 0 else float("inf"),
+        "runs": runs,
+        "bestScore": max(scores, default=int(app.model.score)),
+        "meanScore": sum(scores) / len(scores) if scores else app.model.score,
+        "tickErrors": tickErrors,
+        "seed": app.rng.baseSeed,
+        "stateDigest": digest.hexdigest() if digestState else None,
+        "pipeline": app.controller.pipeline.describe(),
+        "pools": getPoolStats(app)
+    }
+
+def playReplay(path, verbose=False, digestState=False, obstacleBackend="objects"):
+    """Play a recorded run back as fast as possible and return a summary dict"""
+    replay = Replay.load(path)
+    digest = hashlib.sha256()
+    start = time.perf_counter()
+
+    with quiet(verbose):
+        app = createApp(replay.level, obstacleBackend=obstacleBackend)
+        app.replayPlayer = ReplayPlayer(app, replay)
+        app.replayPlayer.start()
+        while not app.replayPlayer.isFinished():
+            app.replayPlayer.step()
+            if digestState:
+                hashState(digest, app)
+
+    elapsed = time.perf_counter() - start
+    if app.isGameOver:
+        ending = "game over"
+    elif app.isLevelComplete:
+        ending = "level complete"
+    else:
+        ending = "stopped"
+    return {
+        "ticks": replay.ticks,
+        "seconds": elapsed,
+        "ticksPerSecond": replay.ticks / elapsed if elapsed > 0 else float("inf"),
+        "level": replay.level,
+        "seed": replay.seed,
+        "events": len(replay.events),
+        "score": int(app.model.score),
+        "ending": ending,
+        "stateDigest": digest.hexdigest() if digestState else None
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the game simulation without a window")
+    parser.add_argument("--headless", action="store_true", help="run without a window (required)")
+    parser.add_argument("--level", type=int, default=1, choices=(1, 2))
+    parser.add_argument("--ticks", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true", help="show the game's own output")
+    parser.add_argument("--pipeline", action="store_true", help="print the tick pipeline order")
+    parser.add_argument("--check-ticks", action="store_true",
+                        help="check that every entity advances exactly once per tick")
+    parser.add_argument("--digest", action="store_true",
+                        help="print a hash of the state after every tick, to compare runs")
+    parser.add_argument("--replay", metavar="FILE", help="play a recorded run back instead")
+    parser.add_argument("--obstacles", default="objects", choices=("objects", "arrays"),
+                        help="obstacle storage: one object each, or NumPy arrays")
+    parser.add_argument("--pools", action="store_true", help="print object pool hits and misses")
+    parser.add_argument("--dump-log", metavar="FILE",
+                        help="write the game's recent log messages to FILE at the end")
+    args = parser.parse_args(argv)
+    if args.dump_log:
+        atexit.register(gameLog.dump, args.dump_log)
+
+    if args.replay:
+        stats = playReplay(args.replay, args.verbose, args.digest, args.obstacles)
+        print(f"Replay of level {stats['level']}, seed {stats['seed']}: {stats['ticks']} ticks, "
+              f"{stats['events']} inputs, in {stats['seconds']:.2f}s ({stats['ticksPerSecond']:.0f} ticks/s)")
+        print(f"Ended in {stats['ending']} with score {stats['score']}")
+        if args.digest:
+            print(f"State digest {stats['stateDigest']}")
+        return 0
+
+    stats = runHeadless(args.level, args.ticks, args.seed, args.verbose, args.check_ticks, args.digest,
+                        args.obstacles)
+    if args.pipeline:
+        print("Tick pipeline:")
+        print(stats["pipeline"])
+
+    # The game runs at 30 steps per second on screen
+    print(f"Level {args.level}: {stats['ticks']} ticks in {stats['seconds']:.2f}s "
+          f"({stats['ticksPerSecond']:.0f} ticks/s, {stats['ticksPerSecond'] / 30:.0f}x real time)")
+    print(f"Runs finished: {stats['runs']}, best score {stats['bestScore']}, "
+          f"mean score {stats['meanScore']:.1f}")
+    if args.digest:
+        print(f"Seed {stats['seed']}, state digest {stats['stateDigest']}")
+    if args.pools:
+        for name, pool in stats["pools"].items():
+            print(f"Pool {name}: {pool['hits']} hits, {pool['misses']} misses, "
+                  f"{pool['dropped']} dropped, {pool['free']}/{pool['capacity']} spare")
+    
+    if args.check_ticks:
+        for tick, name, advanced in stats["tickErrors"][:20]:
+            print(f"Tick {tick}: {name} advanced {advanced} times")
+        print(f"Tick check: {len(stats['tickErrors'])} problems")
+        return 1 if stats["tickErrors"] else 0
+    return 0
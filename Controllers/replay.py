@@ -0,0 +1,246 @@
+"""Recording and playback of runs.
+
+Every key press and release the GameController handles during a run is
+recorded with the tick it happened on, and so are the keys held down
+during each tick (until they are let go). Together with the run's
+seed and level that is enough to play the run back exactly (see
+Models/rng.py). Recordings are saved in data/replays when the run ends.
+
+File format, little-endian: a header (magic "DRRP", version, level, seed,
+length in ticks, event count) followed by one 7-byte record per event
+(tick, kind, key index or bitmask of held keys).
+
+Play a recording back with
+
+    python main.py --replay data/replays/<file>.replay [--speed 4]
+    python main.py --headless --replay data/replays/<file>.replay
+
+Playback keeps a snapshot of the game every KEYFRAME_INTERVAL ticks, so
+seeking backwards restores the nearest snapshot and replays from there.
+"""
+from Models.sprite_cache import sprites
+from Models.log import getLogger
+import copy
+import os
+import struct
+import time
+
+log = getLogger("replay")
+
+REPLAY_MAGIC = b"DRRP"
+REPLAY_VERSION = 2  # 1 recorded held keys per frame, not per tick
+HEADER = struct.Struct("<4sHBQII")  # magic, version, level, seed, ticks, event count
+EVENT = struct.Struct("<IBH")  # tick, kind, key index (press/release) or key mask (hold)
+
+REPLAY_DIRECTORY = "data/replays"
+MAX_REPLAYS = 20  # Older recordings are deleted
+REPLAY_SPEEDS = (1, 4, 16)
+KEYFRAME_INTERVAL = 300  # Ticks between playback snapshots, 10 seconds
+
+PRESS, HOLD, RELEASE = 0, 1, 2
+
+# Keys the game reacts to; anything else is not recorded
+REPLAY_KEYS = ('up', 'w', 'down', 's', 'space', 'x', 'b', 'right', 'd', 'left', 'a',
+               'enter', 'esc', 'r')
+KEY_INDEX = {key: i for i, key in enumerate(REPLAY_KEYS)}
+
+# App attributes that are part of a playback snapshot, besides the model
+APP_STATE = ("timer", "level", "selectedLevel", "isStartScreen", "isPaused",
+             "isGameOver", "isLevelComplete", "isControlsScreen")
+
+class Replay:
+    """A recorded run: level, seed, length and the (tick, kind, key) events"""
+    def __init__(self, level, seed, events=None, ticks=0):
+        self.level = level
+        self.seed = seed
+        self.events = events if events is not None else []
+        self.ticks = ticks
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        tempPath = path + ".tmp"
+        with open(tempPath, "wb") as file:
+            file.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.level, self.seed,
+                                   self.ticks, len(self.events)))
+            for tick, kind, key in self.events:
+                if kind == HOLD:
+                    value = sum(1 << KEY_INDEX[k] for k in key)
+                else:
+                    value = KEY_INDEX[key]
+                file.write(EVENT.pack(tick, kind, value))
+        os.replace(tempPath, path)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, level, seed, ticks, count = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path} is not a replay this version can play")
+
+        events = []
+        for tick, kind, value in EVENT.iter_unpack(data[HEADER.size:HEADER.size + count * EVENT.size]):
+            if kind == HOLD:
+                key = [k for k, i in KEY_INDEX.items() if value & (1 << i)]
+            else:
+                key = REPLAY_KEYS[value]
+            events.append((tick, kind, key))
+        return Replay(level, seed, events, ticks)
+
+class ReplayRecorder:
+    """Records the inputs of the current run and saves them when it ends"""
+    def __init__(self, directory=REPLAY_DIRECTORY, keep=MAX_REPLAYS):
+        self.directory = directory
+        self.keep = keep
+        self.replay = None
+        self.startTick = 0
+        self.heldKeys = []  # Last held keys recorded
+        self.isRecording = False
+        self.lastPath = None
+
+    def start(self, level, seed, tick):
+        self.replay = Replay(level, seed)
+        self.startTick = tick
+        self.heldKeys = []
+        self.isRecording = True
+
+    def record(self, tick, kind, key):
+        if kind == HOLD:
+            # Recorded every tick a key is held, and once on the tick none are
+            key = sorted(k for k in key if k in KEY_INDEX)
+            if not key and not self.heldKeys:
+                return
+            self.heldKeys = key
+        elif key not in KEY_INDEX:
+            return
+        self.replay.events.append((tick - self.startTick, kind, key))
+
+    def finish(self, tick):
+        """Save the run recorded so far, returns the file written"""
+        if not self.isRecording:
+            return None
+        self.isRecording = False
+        self.replay.ticks = tick - self.startTick
+
+        name = f"run-{time.strftime('%Y%m%d-%H%M%S')}-level{self.replay.level}-{self.replay.seed}.replay"
+        path = os.path.join(self.directory, name)
+        try:
+            self.replay.save(path)
+        except OSError as e:
+            log.error("Error saving replay %s: %s", path, e)
+            return None
+        self.lastPath = path
+        self.prune()
+        return path
+
+    def prune(self):
+        files = sorted(f for f in os.listdir(self.directory) if f.endswith(".replay"))
+        for file in files[:-self.keep]:
+            os.remove(os.path.join(self.directory, file))
+
+class ReplayPlayer:
+    """Plays a Replay back through the GameController, at 1x, 4x or 16x"""
+    def __init__(self, app, replay, keyframeInterval=KEYFRAME_INTERVAL):
+        self.app = app
+        self.replay = replay
+        self.keyframeInterval = keyframeInterval
+        self.speed = 1
+        self.runTick = 0
+        self.eventIndex = 0
+        self.keyframes = {}
+        self.isStarted = False
+
+    def start(self):
+        self.app.selectedLevel = self.replay.level
+        self.app.controller.gameFlowController.startGame(self.replay.seed)
+        self.runTick = 0
+        self.eventIndex = 0
+        self.keyframes = {}
+        self.isStarted = True
+
+    def isFinished(self):
+        return self.isStarted and self.runTick >= self.replay.ticks
+
+    def setSpeed(self, speed):
+        if speed in REPLAY_SPEEDS:
+            self.speed = speed
+
+    def tick(self):
+        """One frame of playback at the current speed; the game loop's tick while replaying"""
+        for i in range(self.speed):
+            if not self.isStarted or self.isFinished():
+                return
+            self.step()
+
+    def step(self):
+        """Feed this tick's recorded inputs to the controller and run the tick"""
+        if self.runTick % self.keyframeInterval == 0 and self.runTick not in self.keyframes:
+            self.keyframes[self.runTick] = self.snapshot()
+
+        controller = self.app.controller
+        events = self.replay.events
+        while self.eventIndex < len(events) and events[self.eventIndex][0] <= self.runTick:
+            tick, kind, key = events[self.eventIndex]
+            if kind == PRESS:
+                controller.handleKeyPress(key)
+            elif kind == HOLD:
+                controller.handleKeyHold(key)
+            else:
+                controller.handleKeyRelease(key)
+            self.eventIndex += 1
+
+        controller.tick()
+        self.runTick += 1
+
+    def seek(self, tick):
+        """Jump to tick, restoring the closest earlier snapshot if going backwards"""
+        if not self.isStarted:
+            self.start()
+        tick = max(0, min(tick, self.replay.ticks))
+
+        earlier = [keyframe for keyframe in self.keyframes if keyframe <= tick]
+        if earlier and (tick < self.runTick or max(earlier) > self.runTick):
+            self.restore(max(earlier))
+        while self.runTick < tick:
+            self.step()
+
+    def sharedObjects(self):
+        """deepcopy memo of objects snapshots share instead of copying"""
+        memo = {id(self.app): self.app}
+        if hasattr(self.app, 'rng'):
+            for stream in self.app.rng.streams.values():
+                memo[id(stream)] = stream
+        for frames in list(sprites.frames.values()):
+            memo[id(frames)] = frames
+            for frame in frames:
+                memo[id(frame)] = frame
+        return memo
+
+    def snapshot(self):
+        controller = self.app.controller
+        return {
+            "model": copy.deepcopy(self.app.model, self.sharedObjects()),
+            "app": {name: getattr(self.app, name) for name in APP_STATE},
+            "rng": self.app.rng.getState() if hasattr(self.app, 'rng') else None,
+            "tickCount": controller.tickCount,
+            "keysPressed": set(controller.keysPressed),
+            "eventIndex": self.eventIndex
+        }
+
+    def restore(self, tick):
+        state = self.keyframes[tick]
+        controller = self.app.controller
+
+        # Copy again so the snapshot can be restored more than once
+        controller.setModel(copy.deepcopy(state["model"], self.sharedObjects()))
+        for name, value in state["app"].items():
+            setattr(self.app, name, value)
+        if state["rng"] is not None:
+            self.app.rng.setState(state["rng"])
+        controller.tickCount = state["tickCount"]
+        controller.keysPressed = set(state["keysPressed"])
+        self.eventIndex = state["eventIndex"]
+        self.runTick = tick
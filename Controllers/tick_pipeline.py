@@ -0,0 +1,88 @@
+"""The systems that make up one simulation tick, in the order they run.
+
+Every piece of per-tick game logic is registered here once, under one of
+the stages below, and TickPipeline.run() calls each of them exactly once
+per tick. Nothing else may advance the game: drawing only draws.
+
+    python main.py --headless --pipeline
+
+prints the order (see describe()).
+
+When timings is set (the window's performance overlay, see
+Views/perf_overlay.py), run() also times every system it calls.
+"""
+import time
+
+# Stages in the order they run each tick
+TICK_STAGES = ("input", "ai", "physics", "projectiles", "collisions", "spawning", "scoring")
+
+class TickPipeline:
+    def __init__(self):
+        self.systems = {stage: [] for stage in TICK_STAGES}
+        self.timings = None  # A PerfStats, or None to not time systems
+
+    def register(self, stage, name, system, always=False):
+        """Add system(model) to stage.
+
+        Systems only run while a level is being played unless always is set
+        (e.g. applying reloaded settings, or noticing that a run ended).
+        """
+        if stage not in self.systems:
+            raise ValueError(f"Unknown tick stage {stage!r}, expected one of {TICK_STAGES}")
+        for existing, _, _ in self.systems[stage]:
+            if existing == name:
+                raise ValueError(f"System {name!r} is already registered in {stage!r}")
+        self.systems[stage].append((name, system, always))
+
+    def run(self, model, isActive):
+        if self.timings is not None:
+            self.runTimed(model, isActive)
+            return
+        for stage in TICK_STAGES:
+            for name, system, always in self.systems[stage]:
+                if always or isActive:
+                    system(model)
+
+    def runTimed(self, model, isActive):
+        """run(), adding when each system ran to timings as (stage, name)"""
+        timings = self.timings
+        clock = time.perf_counter
+        for stage in TICK_STAGES:
+            for name, system, always in self.systems[stage]:
+                if always or isActive:
+                    start = clock()
+                    system(model)
+                    timings.add((stage, name), start, clock())
+
+    def describe(self):
+        """The pipeline as text, one system per line in run order"""
+        lines = []
+        number = 1
+        for stage in TICK_STAGES:
+            for name, system, always in self.systems[stage]:
+                note = " (always)" if always else ""
+                lines.append(f"{number:2}. {stage:<12} {name}{note}")
+                number += 1
+        return "\n".join(lines)
+
+def checkSingleAdvance(model, tick):
+    """Run one tick and check every entity advanced exactly once.
+
+    Entities that were spawned or removed during the tick are skipped, as
+    are pooled ones that were removed and handed out again: placing an
+    object bumps its generation, so those count as new ones (see
+    Models/pool.py).
+    Returns a list of (entity, times advanced) for the ones that did not.
+    """
+    # Holding the entities keeps their ids from being reused during the tick
+    before = {id(entity): (entity, entity.generation, entity.tickCount) for entity in model.getEntities()}
+    tick()
+    problems = []
+    for entity in model.getEntities():
+        previous = before.get(id(entity))
+        if previous is None or previous[1] != entity.generation:
+            continue
+        advanced = entity.tickCount - previous[2]
+        if advanced != 1:
+            problems.append((entity, advanced))
+    return problems
@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+from Models.atlas import DINO_SIZE, DINO_DUCK_SIZE
+from Models.dino import DINO_ANIMATIONS
+from Models.sprite_cache import sprites
+import os
+
+def buildManifest(app):
+    """Every sprite the game draws, in load order.
+
+    Each entry is (levels, kind, path, flipped, extensions, size); levels
+    is None for assets needed before any level can start.
+    """
+    manifest = [
+        # Start screen first, it is shown while the rest loads
+        (None, "image", 'assets/bg.jpg', False, None, (app.width, app.height)),
+        (None, "image", 'assets/key.png', False, None, (50, 50)),
+    ]
+    for flipped in (False, True):
+        for size in (DINO_SIZE, DINO_DUCK_SIZE):
+            for directory in DINO_ANIMATIONS.values():
+                manifest.append((None, "frames", directory, flipped, ('.gif',), size))
+        manifest.append((None, "frames", 'assets/split_fire', flipped, ('.gif',), (60, 40)))
+    manifest += [
+        (None, "frames", 'assets/split_fire', False, ('.gif',), (40, 35)),
+        (None, "image", 'assets/ground.png', False, None, (app.width, 40)),
+        # Obstacles only appear in level 1
+        ((1,), "frames", 'assets/bird/flying', False, ('.gif',), (60, 50)),
+        ((1,), "frames", 'assets/wifi_meteor', False, ('.gif',), (45, 70)),
+        ((1,), "frames", 'assets/cactus', False, ('.png', '.gif'), (60, 60)),
+    ]
+    return manifest
+
+class AssetPreloader:
+    """Decodes the sprite manifest on a thread pool while the start screen is up"""
+    def __init__(self, app, workers=None):
+        self.manifest = buildManifest(app)
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.executor = None
+        self.futures = []
+        self.isFinished = False
+
+    def start(self):
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="asset-loader")
+        for levels, kind, path, flipped, extensions, size in self.manifest:
+            if kind == "image":
+                future = sprites.prefetchImage(self.executor, path, flipped, size)
+            else:
+                future = sprites.prefetchFrames(self.executor, path, flipped, extensions, size)
+            self.futures.append((levels, future))
+
+    def update(self, wrapLimit=4):
+        """Called every step: hand a few finished decodes to the UI thread"""
+        if self.isFinished:
+            return
+        sprites.wrapPrefetched(wrapLimit)
+        if all(future is None or future.done() for levels, future in self.futures):
+            sprites.wrapPrefetched()
+            self.executor.shutdown(wait=False)
+            self.isFinished = True
+
+    def getProgress(self):
+        if not self.futures:
+            return 1.0
+        done = sum(1 for levels, future in self.futures if future is None or future.done())
+        return done / len(self.futures)
+
+    def isReady(self, level=None):
+        """True once every asset needed to play level has been decoded"""
+        for levels, future in self.futures:
+            if levels is not None and level not in levels:
+                continue
+            if future is not None and not future.done():
+                return False
+        return True
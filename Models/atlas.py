@@ -0,0 +1,183 @@
+"""Texture atlas: every animation frame packed into one sheet.
+
+Build it with:
+
+    python -m Models.atlas
+
+This walks the animation folders below, packs every frame (plus a
+pre-mirrored copy) at each size it is drawn on screen into
+assets/atlas.png and writes the rects, frame order and durations to
+assets/atlas.json. When both files exist the sprite cache reads frames
+out of the sheet instead of opening each GIF.
+Re-run the build after changing any of the source frames.
+"""
+from PIL import Image
+from Models.log import getLogger
+import json
+import os
+
+log = getLogger("assets")
+
+ATLAS_VERSION = 2
+ATLAS_IMAGE = "assets/atlas.png"
+ATLAS_INDEX = "assets/atlas.json"
+ATLAS_MAX_WIDTH = 4096
+ATLAS_PADDING = 1
+DEFAULT_FRAME_DURATION = 100  # ms, for frames without GIF timing
+
+# Animation folders packed into the atlas, with the file types they hold
+ATLAS_DIRECTORIES = {
+    "assets/dino/walking": (".gif",),
+    "assets/dino/idle": (".gif",),
+    "assets/dino/die": (".gif",),
+    "assets/dino/attack": (".gif",),
+    "assets/bird/flying": (".gif",),
+    "assets/wifi_meteor": (".gif",),
+    "assets/split_fire": (".gif",),
+    "assets/cactus": (".png", ".gif"),
+}
+
+# On-screen sizes (width, height) each animation is drawn at. These must
+# match the entity sizes: a standing and a ducking dino, the obstacles
+# spawned by ObstacleManager and the fire breathed by the dinos.
+DINO_SIZE = (70, 70)
+DINO_DUCK_SIZE = (70, 40)
+SPRITE_SIZES = {
+    "assets/dino/walking": [DINO_SIZE, DINO_DUCK_SIZE],
+    "assets/dino/idle": [DINO_SIZE, DINO_DUCK_SIZE],
+    "assets/dino/die": [DINO_SIZE, DINO_DUCK_SIZE],
+    "assets/dino/attack": [DINO_SIZE, DINO_DUCK_SIZE],
+    "assets/bird/flying": [(60, 50)],
+    "assets/wifi_meteor": [(45, 70)],
+    "assets/split_fire": [(60, 40)],
+    "assets/cactus": [(60, 60)],
+}
+
+def sizeKey(size):
+    return "native" if size is None else f"{size[0]}x{size[1]}"
+
+def scaleImage(image, size):
+    """Resample an image to the exact size it is drawn at"""
+    if size is None or image.size == tuple(size):
+        return image
+    return image.resize(size, Image.LANCZOS)
+
+def frameSortKey(filename):
+    """Sort numbered frames (0.gif, 1.gif, ... 10.gif) numerically"""
+    stem = filename.split('.')[0]
+    return (int(stem) if stem.isdigit() else 0, filename)
+
+def listFrameFiles(directory, extensions=('.gif',)):
+    if not os.path.exists(directory):
+        return []
+    files = [f for f in os.listdir(directory) if f.endswith(extensions)]
+    files.sort(key=frameSortKey)
+    return files
+
+def collectFrames():
+    """Load every frame variant as (directory, size, orientation, file, duration, image)"""
+    frames = []
+    for directory, extensions in ATLAS_DIRECTORIES.items():
+        for file in listFrameFiles(directory, extensions):
+            source = Image.open(os.path.join(directory, file))
+            duration = source.info.get("duration", DEFAULT_FRAME_DURATION)
+            source = source.convert("RGBA")
+            for size in SPRITE_SIZES.get(directory) or [None]:
+                image = scaleImage(source, size)
+                frames.append((directory, sizeKey(size), "right", file, duration, image))
+                frames.append((directory, sizeKey(size), "left", file, duration,
+                               image.transpose(Image.FLIP_LEFT_RIGHT)))
+    return frames
+
+def packShelves(sizes, maxWidth=ATLAS_MAX_WIDTH, padding=ATLAS_PADDING):
+    """Place rectangles on horizontal shelves, tallest first.
+
+    Returns the (x, y) of each size in input order and the sheet size.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][1])
+    positions = [None] * len(sizes)
+    x = y = shelfHeight = sheetWidth = 0
+
+    for i in order:
+        width, height = sizes[i]
+        if x > 0 and x + width > maxWidth:
+            y += shelfHeight + padding
+            x = shelfHeight = 0
+        positions[i] = (x, y)
+        x += width + padding
+        shelfHeight = max(shelfHeight, height)
+        sheetWidth = max(sheetWidth, x - padding)
+
+    return positions, (max(sheetWidth, 1), max(y + shelfHeight, 1))
+
+def buildAtlas(imagePath=ATLAS_IMAGE, indexPath=ATLAS_INDEX):
+    frames = collectFrames()
+    positions, sheetSize = packShelves([frame[5].size for frame in frames])
+
+    sheet = Image.new("RGBA", sheetSize, (0, 0, 0, 0))
+    animations = {}
+    for (directory, size, orientation, file, duration, image), (x, y) in zip(frames, positions):
+        sheet.paste(image, (x, y))
+        sizes = animations.setdefault(directory, {})
+        animation = sizes.setdefault(size, {"right": [], "left": []})
+        animation[orientation].append({
+            "file": file,
+            "rect": [x, y, image.width, image.height],
+            "duration": duration
+        })
+
+    sheet.save(imagePath)
+    with open(indexPath, "w") as file:
+        json.dump({
+            "version": ATLAS_VERSION,
+            "image": os.path.basename(imagePath),
+            "size": list(sheetSize),
+            "animations": animations
+        }, file, indent=1)
+
+    return len(frames), sheetSize
+
+class Atlas:
+    """Runtime view of a built atlas"""
+    def __init__(self, index, sheet):
+        self.animations = index["animations"]
+        self.sheet = sheet
+
+    @staticmethod
+    def load(indexPath=ATLAS_INDEX):
+        """Return the atlas if one has been built, otherwise None"""
+        if not os.path.exists(indexPath):
+            return None
+        try:
+            with open(indexPath, "r") as file:
+                index = json.load(file)
+            if index.get("version") != ATLAS_VERSION:
+                log.warning("Ignoring atlas %s: built with an older version, rebuild it", indexPath)
+                return None
+            sheet = Image.open(os.path.join(os.path.dirname(indexPath), index["image"]))
+            sheet.load()
+        except Exception as e:
+            log.error("Error loading atlas %s: %s", indexPath, e)
+            return None
+        return Atlas(index, sheet)
+
+    def hasAnimation(self, directory, size=None):
+        return sizeKey(size) in self.animations.get(directory, {})
+
+    def getFrames(self, directory, flipped=False, size=None):
+        """Return the PIL frames of an animation, cut out of the sheet"""
+        entries = self.animations[directory][sizeKey(size)]["left" if flipped else "right"]
+        frames = []
+        for entry in entries:
+            x, y, width, height = entry["rect"]
+            frames.append(self.sheet.crop((x, y, x + width, y + height)))
+        return frames
+
+    def getDurations(self, directory, size=None):
+        """Return the frame durations (ms) of an animation at one of its packed sizes"""
+        entries = self.animations[directory][sizeKey(size)]["right"]
+        return [entry["duration"] for entry in entries]
+
+if __name__ == "__main__":
+    count, (width, height) = buildAtlas()
+    print(f"Packed {count} frames into {ATLAS_IMAGE} ({width}x{height}), index in {ATLAS_INDEX}")
@@ -14,13 +14,53 @@ class GameModel:
         pass
 
 class GameObject:
+    # Entities come and go by the hundred: every attribute is declared in
+    # __slots__ (here and in each subclass), so instances carry no __dict__
+    __slots__ = ("x", "y", "width", "height", "prevX", "prevY", "tickCount", "generation")
+    
+    # How far the frame being drawn is between the last two ticks, set by the view
+    renderAlpha = 1.0
+    
     def __init__(self, x, y, width=20, height=20):
+        self.generation = 0
+        self.place(x, y, width, height)
+    
+    def place(self, x, y, width, height):
+        """Put the object at x, y as if it had just been made; pooled objects reset through this"""
         self.x = x
         self.y = y
         self.width = width
         self.height = height
         
-    def collidesWith(self, other):
-        """Check if this object collides with another one"""
-        return (abs(self.x - other.x) < (self.width + other.width) // 2 and
-                abs(self.y - other.y) < (self.height + other.height) // 2)
\ No newline at end of file
+        # Position before the current tick, for interpolated drawing
+        self.prevX = x
+        self.prevY = y
+        
+        # Ticks this object has advanced, and how many times it was (re)made,
+        # see checkSingleAdvance in Controllers/tick_pipeline.py
+        self.tickCount = 0
+        self.generation += 1
+    
+    def savePosition(self):
+        """Called at the start of every tick"""
+        self.prevX = self.x
+        self.prevY = self.y
+    
+    @property
+    def drawX(self):
+        return self.prevX + (self.x - self.prevX) * GameObject.renderAlpha
+    
+    @property
+    def drawY(self):
+        return self.prevY + (self.y - self.prevY) * GameObject.renderAlpha
+        
+    def getBox(self):
+        return self.boxAt(self.x, self.y)
+    
+    def getPreviousBox(self):
+        """The box at the start of the tick"""
+        return self.boxAt(self.prevX, self.prevY)
+    
+    def boxAt(self, x, y):
+        """(left, top, right, bottom); x, y is the top-left corner, as drawn"""
+        return (x, y, x + self.width, y + self.height)
\ No newline at end of file
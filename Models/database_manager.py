@@ -1,5 +1,14 @@
+import atexit
 import csv
+import math
 import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from Models.log import getLogger
+
+log = getLogger("database")
 
 # to mitigate errors, 
 # I'm creating a folder called assuming maybe it is not there
@@ -11,6 +20,10 @@ LEVEL_1_FILE = "data/level_1.csv"
 LEVEL_2_FILE = "data/level_2.csv"
 BATTLE_FILE = "data/battle.csv"
 HIGHSCORE_FILE = "data/highscore.csv"
+RANKING_FILE = "data/ranking.db"
+
+# Name scores are recorded under unless DINO_PLAYER is set
+DEFAULT_PLAYER = "Player"
 
 # Default settings for Level 1
 DEFAULT_LEVEL_1 = {
@@ -22,7 +35,8 @@ DEFAULT_LEVEL_1 = {
     "meteorProbability": 0.2,
     "birdCount": 1,
     "cactusCount": 1,
-    "meteorCount": 1
+    "meteorCount": 1,
+    "maxFireCount": 3
 }
 
 # Default settings for Level 2 (Battle mode)
@@ -35,7 +49,8 @@ DEFAULT_LEVEL_2 = {
     "meteorProbability": 0.3,
     "birdCount": 15,
     "cactusCount": 15,
-    "meteorCount": 15
+    "meteorCount": 15,
+    "maxFireCount": 5
 }
 
 # Default settings for Battle mode
@@ -91,48 +106,207 @@ if not os.path.exists(BATTLE_FILE):
 if not os.path.exists(HIGHSCORE_FILE):
     create_highscore_file()
 
-def get_level_settings(level=1):
-    settings = DEFAULT_LEVEL_1.copy() if level == 1 else DEFAULT_LEVEL_2.copy()
+# Parsed settings per file, re-read only when the file's mtime or size changes
+_settings_cache = {}
+
+# Files kept up to date by a SettingsWatcher; reading them skips the stat call
+_watched_files = set()
+
+# Timestamps of recent file reads, to check how often we hit the disk
+_read_times = deque()
+_total_reads = 0
+
+def _record_read():
+    global _total_reads
+    _total_reads += 1
+    now = time.monotonic()
+    _read_times.append(now)
+    while _read_times and _read_times[0] < now - 60:
+        _read_times.popleft()
+
+def get_read_stats():
+    """Number of data file reads in total and during the last minute"""
+    now = time.monotonic()
+    while _read_times and _read_times[0] < now - 60:
+        _read_times.popleft()
+    return {"total": _total_reads, "lastMinute": len(_read_times)}
+
+def get_file_version(path):
+    """(mtime, size) of a file, or None if it can't be read"""
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+def _get_cached(path, parse):
+    """Return parse()'s result for path, parsing again only if the file changed"""
+    cached = _settings_cache.get(path)
+    if cached is not None and path in _watched_files:
+        return cached[1]
     
-    level_file = LEVEL_1_FILE if level == 1 else LEVEL_2_FILE
+    version = get_file_version(path)
+    if cached is not None and version is not None and cached[0] == version:
+        return cached[1]
     
-    with open(level_file, "r") as file:
-        reader = csv.reader(file)
-        next(reader)  
+    settings = parse()
+    _settings_cache[path] = (version, settings)
+    return settings
+
+def parse_settings_file(path):
+    """Parse and validate one of the settings files, raising SettingsError if it is bad"""
+    if path == LEVEL_1_FILE:
+        return LevelConfig.from_file(path, DEFAULT_LEVEL_1)
+    if path == LEVEL_2_FILE:
+        return LevelConfig.from_file(path, DEFAULT_LEVEL_2)
+    if path == BATTLE_FILE:
+        return BattleConfig.from_file(path, DEFAULT_BATTLE)
+    raise ValueError(f"{path} is not a settings file")
+
+def default_settings(path):
+    """The built-in settings for one of the settings files"""
+    if path == LEVEL_1_FILE:
+        return LevelConfig(**DEFAULT_LEVEL_1)
+    if path == LEVEL_2_FILE:
+        return LevelConfig(**DEFAULT_LEVEL_2)
+    if path == BATTLE_FILE:
+        return BattleConfig(**DEFAULT_BATTLE)
+    raise ValueError(f"{path} is not a settings file")
+
+def load_settings_file(path):
+    """Settings from path, or the defaults if the file is missing or has a bad row"""
+    try:
+        return parse_settings_file(path)
+    except (OSError, SettingsError, csv.Error) as e:
+        log.error("Using default settings: %s", e)
+        return default_settings(path)
+
+def watch_settings_file(path):
+    """Let a watcher keep path's cached settings current, so reads skip the stat call"""
+    _watched_files.add(path)
+
+def set_cached_settings(path, version, settings):
+    """Replace the cached settings for path with ones parsed by a watcher"""
+    _settings_cache[path] = (version, settings)
+
+class SettingsError(ValueError):
+    """A settings file has a row that can't be used"""
+
+def _number(minimum=0, maximum=None, whole=False):
+    """Converter for numeric settings, raising ValueError with the problem"""
+    def convert(text):
+        try:
+            value = float(text)
+        except ValueError:
+            raise ValueError("must be a number")
+        # float() also takes "nan" and "inf", which every check below lets through
+        if not math.isfinite(value):
+            raise ValueError("must be a finite number")
+        if whole:
+            if value != int(value):
+                raise ValueError("must be a whole number")
+            value = int(value)
+        if value < minimum:
+            raise ValueError(f"must be at least {minimum}")
+        if maximum is not None and value > maximum:
+            raise ValueError(f"must be at most {maximum}")
+        return value
+    return convert
+
+def _text(text):
+    if not text.strip():
+        raise ValueError("must not be empty")
+    return text.strip()
+
+class Config:
+    """Read-only settings object, validated when its file is loaded.
+
+    Subclasses list their settings in FIELDS (CSV key -> converter); each
+    becomes a slot, so reading a setting is a plain attribute access.
+    """
+    __slots__ = ()
+    FIELDS = {}
+
+    def __init__(self, **values):
+        for key in self.FIELDS:
+            object.__setattr__(self, key, values[key])
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self):
+        values = ", ".join(f"{key}={getattr(self, key)!r}" for key in self.FIELDS)
+        return f"{type(self).__name__}({values})"
+
+    # Immutable, so copies (e.g. replay keyframes) can share it
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    @classmethod
+    def from_file(cls, path, defaults):
+        """Parse a setting,value CSV on top of defaults, raising SettingsError on bad rows"""
+        values = dict(defaults)
         
-        for row in reader:
-            if len(row) < 2:
-                continue
-                
-            key = row[0]
-            value = row[1]
+        _record_read()
+        with open(path, "r") as file:
+            reader = csv.reader(file)
+            next(reader, None)  # Skip header
             
-            if key in ["spawnInterval", "cactusSpeed", "birdSpeed", 
-                       "birdCount", "cactusCount", "meteorCount", "maxFireCount"]:
-                settings[key] = float(value)
-            elif key in ["birdProbability", "meteorProbability"]:
-                settings[key] = float(value)
-            else:
-                settings[key] = value
+            for row in reader:
+                if len(row) < 2:
+                    continue
+                
+                key = row[0].strip()
+                text = row[1].strip()
+                if key not in cls.FIELDS:
+                    raise SettingsError(f"{path} line {reader.line_num}: unknown setting '{key}'")
+                try:
+                    values[key] = cls.FIELDS[key](text)
+                except ValueError as e:
+                    raise SettingsError(f"{path} line {reader.line_num}: {key} {e}, got '{text}'")
         
-    # Create the settings object 
-    return {
-        "name": settings["name"],
-        "spawnInterval": settings["spawnInterval"],
-        "baseSpeed": {
-            "cactus": settings["cactusSpeed"],
-            "bird": settings["birdSpeed"]
-        },
-        "birdProbability": settings["birdProbability"],
-        "meteorProbability": settings["meteorProbability"],
-        "birdCount": int(settings.get("birdCount", DEFAULT_LEVEL_1["birdCount"] if level == 1 else DEFAULT_LEVEL_2["birdCount"])),
-        "cactusCount": int(settings.get("cactusCount", DEFAULT_LEVEL_1["cactusCount"] if level == 1 else DEFAULT_LEVEL_2["cactusCount"])),
-        "meteorCount": int(settings.get("meteorCount", DEFAULT_LEVEL_1["meteorCount"] if level == 1 else DEFAULT_LEVEL_2["meteorCount"])),
-        "maxFireCount": int(settings.get("maxFireCount", 3 if level == 1 else 5))
+        return cls(**values)
+
+class LevelConfig(Config):
+    FIELDS = {
+        "name": _text,
+        "spawnInterval": _number(),
+        "cactusSpeed": _number(),
+        "birdSpeed": _number(),
+        "birdProbability": _number(maximum=1),
+        "meteorProbability": _number(maximum=1),
+        "birdCount": _number(whole=True),
+        "cactusCount": _number(whole=True),
+        "meteorCount": _number(whole=True),
+        "maxFireCount": _number(whole=True)
     }
+    __slots__ = tuple(FIELDS)
+
+class BattleConfig(Config):
+    FIELDS = {
+        "enemies_count": _number(whole=True),
+        "life": _number(minimum=1, whole=True),
+        "damage": _number(whole=True),
+        "enemy_fire_damage": _number(whole=True),
+        "player_fire_damage": _number(whole=True),
+        "spawn_interval": _number(whole=True)
+    }
+    __slots__ = tuple(FIELDS)
+
+def get_level_settings(level=1):
+    """LevelConfig for a level, shared by every caller"""
+    level_file = get_level_file(level)
+    return _get_cached(level_file, lambda: load_settings_file(level_file))
+
+def get_level_file(level):
+    return LEVEL_1_FILE if level == 1 else LEVEL_2_FILE
 
 # Get the high score
 def get_highscore():
+    _record_read()
     with open(HIGHSCORE_FILE, "r") as file:
         reader = csv.reader(file)
         next(reader)  
@@ -149,40 +323,206 @@ def update_highscore(score):
     if score <= current_score:
         return False
     
-    with open(HIGHSCORE_FILE, "w", newline="") as file:
+    _write_highscore(score)
+    return True 
+
+def _write_highscore(score):
+    # Write a temp file and rename it over the old one, so a crash
+    # leaves either the old or the new score, never a truncated file
+    temp_file = HIGHSCORE_FILE + ".tmp"
+    with open(temp_file, "w", newline="") as file:
         writer = csv.writer(file)
         writer.writerow(["highscore"]) 
         writer.writerow([score])  
-    return True 
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_file, HIGHSCORE_FILE)
+
+class HighScoreStore:
+    """High score kept in memory and written behind.
+
+    submit() only updates the value; the file is written from a background
+    thread at most once every flush_interval seconds, and right away by
+    request_flush() (game over) and flush() (exit).
+    """
+    def __init__(self, flush_interval=5.0):
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.value = get_highscore()
+        self.saved_value = self.value
+        self.timer = None
+
+    def __deepcopy__(self, memo):
+        # One store per process; copies of the game model share it
+        return self
+
+    def submit(self, score):
+        """Record a score, returns True if it is a new high score"""
+        with self.lock:
+            if score <= self.value:
+                return False
+            self.value = score
+            if self.timer is None:
+                self.timer = threading.Timer(self.flush_interval, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+        return True
+
+    def request_flush(self):
+        """Write the current value soon, without blocking the caller"""
+        if self.value != self.saved_value:
+            threading.Thread(target=self.flush, name="highscore-flush", daemon=True).start()
+
+    def flush(self):
+        # Writes are serialised by their own lock so submit() never waits on the disk
+        with self.write_lock:
+            with self.lock:
+                if self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+                value = self.value
+            if value == self.saved_value:
+                return
+            try:
+                _write_highscore(value)
+                self.saved_value = value
+            except OSError as e:
+                log.error("Error saving high score: %s", e)
+
+_highscore_store = None
+
+def get_highscore_store():
+    """The process-wide HighScoreStore, flushed when the game exits"""
+    global _highscore_store
+    if _highscore_store is None:
+        _highscore_store = HighScoreStore()
+        atexit.register(_highscore_store.flush)
+    return _highscore_store
 
 def get_battle_settings():
-    """Get enemy and battle settings"""
-    settings = DEFAULT_BATTLE.copy()
-    
-    try:
-        with open(BATTLE_FILE, "r") as file:
-            reader = csv.reader(file)
-            next(reader)  # Skip header
-            
-            for row in reader:
-                if len(row) < 2:
-                    continue
-                    
-                key = row[0].strip()
-                value = row[1].strip()
-                
-                if key in ["enemies_count", "life", "damage", "enemy_fire_damage", "player_fire_damage", "spawn_interval"]:
-                    settings[key] = int(value)
-                else:
-                    settings[key] = value
-    except Exception as e:
-        print(f"Error loading battle settings: {e}")
-    
-    return {
-        "enemies_count": settings.get("enemies_count", 3),
-        "life": settings.get("life", 100),
-        "damage": settings.get("damage", 20),
-        "enemy_fire_damage": settings.get("enemy_fire_damage", 15),
-        "player_fire_damage": settings.get("player_fire_damage", 25),
-        "spawn_interval": settings.get("spawn_interval", 300)
-    } 
\ No newline at end of file
+    """BattleConfig with enemy and battle settings, shared by every caller"""
+    return _get_cached(BATTLE_FILE, lambda: load_settings_file(BATTLE_FILE))
+
+# Schema migrations for the ranking database, applied in order, each in
+# one transaction. PRAGMA user_version holds how many have been applied.
+RANKING_MIGRATIONS = [
+    (
+        """CREATE TABLE IF NOT EXISTS scores (
+            id INTEGER PRIMARY KEY,
+            player TEXT NOT NULL,
+            level INTEGER NOT NULL,
+            score INTEGER NOT NULL,
+            created_at REAL NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS scores_by_level ON scores (level, score DESC)",
+        "CREATE INDEX IF NOT EXISTS scores_by_player ON scores (player, level, score DESC)",
+    ),
+    # Covers top_scores (ordered by score, then created_at) and
+    # player_rank (distinct players above a score) without reading the table
+    (
+        "DROP INDEX IF EXISTS scores_by_level",
+        "CREATE INDEX IF NOT EXISTS scores_by_level_score ON scores (level, score DESC, created_at, player)",
+    ),
+]
+
+class RankingStore:
+    """Per-player, per-level scores in SQLite.
+
+    Every query is answered from an index alone (top-N and rank by
+    level, best score per player and level), so the start screen never
+    reads the table itself. The single number in highscore.csv is
+    imported once, as a level 1 score by DEFAULT_PLAYER, in the same
+    transaction that creates the table.
+    """
+    def __init__(self, path=RANKING_FILE):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.query_cache = {}
+        self.migrate()
+
+    def migrate(self):
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        for number, statements in enumerate(RANKING_MIGRATIONS[version:], start=version + 1):
+            # sqlite3 only opens transactions for data changes, so begin one
+            # explicitly: a migration and its version bump land together or not at all
+            with self.connection:
+                self.connection.execute("BEGIN")
+                for statement in statements:
+                    self.connection.execute(statement)
+                if number == 1:
+                    self.import_highscore_file()
+                self.connection.execute(f"PRAGMA user_version = {number}")
+
+    def import_highscore_file(self):
+        """Carry the old single high score over into the ranking (part of the first migration)"""
+        if not os.path.exists(HIGHSCORE_FILE):
+            return
+        try:
+            score = get_highscore()
+            created_at = os.path.getmtime(HIGHSCORE_FILE)
+        except (OSError, ValueError, csv.Error, StopIteration) as e:
+            log.warning("Not importing %s into the ranking: %r", HIGHSCORE_FILE, e)
+            return
+        if score > 0:
+            self.insert_score(DEFAULT_PLAYER, 1, score, created_at)
+
+    def record_score(self, player, level, score, created_at=None):
+        with self.connection:
+            self.insert_score(player, level, score, created_at)
+        self.query_cache = {}
+
+    def insert_score(self, player, level, score, created_at=None):
+        """Add a score inside the caller's transaction"""
+        self.connection.execute(
+            "INSERT INTO scores (player, level, score, created_at) VALUES (?, ?, ?, ?)",
+            (player, level, int(score), created_at if created_at is not None else time.time()))
+
+    def cached_query(self, key, sql, params):
+        # The start screen asks every frame; results only change when a score is recorded
+        if key not in self.query_cache:
+            self.query_cache[key] = self.connection.execute(sql, params).fetchall()
+        return self.query_cache[key]
+
+    def top_scores(self, level, limit=5):
+        """Best (player, score) pairs for a level, one row per run"""
+        return self.cached_query(
+            ("top", level, limit),
+            "SELECT player, score FROM scores WHERE level = ? "
+            "ORDER BY score DESC, created_at ASC LIMIT ?", (level, limit))
+
+    def personal_best(self, player, level):
+        row = self.cached_query(
+            ("best", player, level),
+            "SELECT MAX(score) FROM scores WHERE player = ? AND level = ?", (player, level))
+        return row[0][0] if row[0][0] is not None else 0
+
+    def player_rank(self, player, level):
+        """1-based rank of the player's best score among players, None if they have no score"""
+        best = self.cached_query(
+            ("best", player, level),
+            "SELECT MAX(score) FROM scores WHERE player = ? AND level = ?", (player, level))[0][0]
+        if best is None:
+            return None
+        ahead = self.cached_query(
+            ("ahead", level, best),
+            "SELECT COUNT(DISTINCT player) FROM scores WHERE level = ? AND score > ?", (level, best))
+        return ahead[0][0] + 1
+
+    def close(self):
+        self.connection.close()
+
+_ranking_store = None
+
+def get_ranking_store():
+    """The process-wide RankingStore"""
+    global _ranking_store
+    if _ranking_store is None:
+        _ranking_store = RankingStore()
+        atexit.register(_ranking_store.close)
+    return _ranking_store
+
+def get_player_name():
+    return os.environ.get("DINO_PLAYER", DEFAULT_PLAYER)
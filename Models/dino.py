@@ -1,15 +1,57 @@
 from Models.base_model import GameObject
 from Models.fire import Fire
-from cmu_graphics import *
-from PIL import Image
-import os
+from Models.pool import getPool
+from Models.sprite_cache import sprites
+from Models.graphics import *
+from Models.log import getLogger
 import Models.database_manager as db
 
+log = getLogger("player")
+
+DINO_ANIMATIONS = {
+    "walking": 'assets/dino/walking',
+    "idle": 'assets/dino/idle',
+    "die": 'assets/dino/die',
+    "attack": 'assets/dino/attack'
+}
+
+# Frames for other sizes (ducking), by (animation, facing right, width, height),
+# looked up the first time a dino is drawn at that size and shared by all of them
+SIZED_FRAMES = {}
+
 class Dino(GameObject):
+    __slots__ = (
+        "app", "isFacingRight", "isJumping", "isDucking", "isRunning", "isDead", "isIdle",
+        "isAttacking", "attackInProgress", "attackComplete", "attackTotalFrames",
+        "isDeathAnimationPlaying", "deathAnimationFrame", "deathAnimationComplete",
+        "maxHealth", "health", "isInvulnerable", "invulnerabilityTimer",
+        "originalHeight", "yVelocity", "groundY", "state_frame_index", "animationTimer",
+        "active_fires", "fire_timer", "should_create_fire", "current_fire_count",
+        "total_fires_used", "levelConfig", "max_fire_count",
+        "walking_frames", "idle_frames", "die_frames", "attack_frames",
+        "left_walking_frames", "left_idle_frames", "left_die_frames", "left_attack_frames"
+    )
+    
+    invulnerabilityDuration = 30  # 1 second of invulnerability after taking damage
+    moveD = 5
+    duckHeight = 40
+    # Per tick; a jump lasts about a second
+    gravity = 1.6
+    jumpForce = -24
+    animationInterval = 5  # Ticks per animation frame
+    fire_delay = 10  # Ticks to wait before creating fire
+    fire_speed = 16
+    
     def __init__(self, app, x, y):
         super().__init__(x, y, width=70, height=70)
         self.app = app
         
+        self.loadFrames()
+        self.resetState()
+    
+    def resetState(self):
+        """Set everything that changes during a life back to how it starts"""
+        self.isFacingRight = True
         self.isJumping = False
         self.isDucking = False
         self.isRunning = True
@@ -28,76 +70,54 @@ class Dino(GameObject):
         self.health = self.maxHealth
         self.isInvulnerable = False
         self.invulnerabilityTimer = 0
-        self.invulnerabilityDuration = 60  # 1 second of invulnerability after taking damage
-        
-        self.moveD = 5
         
         self.originalHeight = self.height
-        self.gravity = 0.4
-        self.jumpForce = -12
         self.yVelocity = 0
         self.groundY = self.app.groundY
 
         self.y = self.groundY - self.height
         
-        self.loadFrames()
-        
         self.state_frame_index = 0
         self.animationTimer = 0
         
         # Fire effect
         self.active_fires = []
-        self.fire_delay = 20  # Frames to wait before creating fire
         self.fire_timer = 0
         self.should_create_fire = False
         self.current_fire_count = 0
         self.total_fires_used = 0  # Track total fires used (permanent counter)
         
         # Get max fire count from level settings
-        level_settings = db.get_level_settings(self.app.level)
-        self.max_fire_count = level_settings.get('maxFireCount')
-        
-    def loadFrames(self):
-        walking_dir = 'assets/dino/walking'
-        idle_dir = 'assets/dino/idle'
-        die_dir = 'assets/dino/die'
-        attack_dir = 'assets/dino/attack'
+        self.applyLevelConfig(db.get_level_settings(self.app.level))
         
-        self.walking_frames_pil = self.loadFramesFromDir(walking_dir)
-        self.idle_frames_pil = self.loadFramesFromDir(idle_dir)
-        self.die_frames_pil = self.loadFramesFromDir(die_dir)
-        self.attack_frames_pil = self.loadFramesFromDir(attack_dir)
+    def applyLevelConfig(self, config):
+        self.levelConfig = config
+        self.max_fire_count = config.maxFireCount
         
+    def loadFrames(self):
         self.isFacingRight = True
-        self.left_walking_frames_pil = [frame.transpose(Image.FLIP_LEFT_RIGHT) for frame in self.walking_frames_pil]
-        self.left_idle_frames_pil = [frame.transpose(Image.FLIP_LEFT_RIGHT) for frame in self.idle_frames_pil]
-        self.left_die_frames_pil = [frame.transpose(Image.FLIP_LEFT_RIGHT) for frame in self.die_frames_pil]
-        self.left_attack_frames_pil = [frame.transpose(Image.FLIP_LEFT_RIGHT) for frame in self.attack_frames_pil]
         
-        self.walking_frames = [CMUImage(frame) for frame in self.walking_frames_pil]
-        self.idle_frames = [CMUImage(frame) for frame in self.idle_frames_pil]
-        self.die_frames = [CMUImage(frame) for frame in self.die_frames_pil]
-        self.attack_frames = [CMUImage(frame) for frame in self.attack_frames_pil]
+        # Frames are shared between every dino through the sprite cache and
+        # come pre-scaled to the size the dino is drawn at
+        size = (self.width, self.height)
+        self.walking_frames = sprites.getFrames(DINO_ANIMATIONS["walking"], size=size)
+        self.idle_frames = sprites.getFrames(DINO_ANIMATIONS["idle"], size=size)
+        self.die_frames = sprites.getFrames(DINO_ANIMATIONS["die"], size=size)
+        self.attack_frames = sprites.getFrames(DINO_ANIMATIONS["attack"], size=size)
         
-        self.left_walking_frames = [CMUImage(frame) for frame in self.left_walking_frames_pil]
-        self.left_idle_frames = [CMUImage(frame) for frame in self.left_idle_frames_pil]
-        self.left_die_frames = [CMUImage(frame) for frame in self.left_die_frames_pil]
-        self.left_attack_frames = [CMUImage(frame) for frame in self.left_attack_frames_pil]
+        self.left_walking_frames = sprites.getFrames(DINO_ANIMATIONS["walking"], flipped=True, size=size)
+        self.left_idle_frames = sprites.getFrames(DINO_ANIMATIONS["idle"], flipped=True, size=size)
+        self.left_die_frames = sprites.getFrames(DINO_ANIMATIONS["die"], flipped=True, size=size)
+        self.left_attack_frames = sprites.getFrames(DINO_ANIMATIONS["attack"], flipped=True, size=size)
 
-    def loadFramesFromDir(self, directory):
-        frames = []
-        if os.path.exists(directory):
-            files = [f for f in os.listdir(directory) if f.endswith('.gif')]
-            files.sort(key=lambda x: int(x.split('.')[0]))
-            
-            for file in files:
-                file_path = os.path.join(directory, file)
-                try:
-                    img = Image.open(file_path)
-                    frames.append(img)
-                except Exception as e:
-                    pass
-                    
+    def getSizedFrames(self, name):
+        """Frames of an animation at the dino's current size and facing"""
+        key = (name, self.isFacingRight, self.width, self.height)
+        frames = SIZED_FRAMES.get(key)
+        if frames is None:
+            frames = sprites.getFrames(DINO_ANIMATIONS[name], flipped=not self.isFacingRight,
+                                       size=(self.width, self.height))
+            SIZED_FRAMES[key] = frames
         return frames
 
     def jump(self):
@@ -108,7 +128,7 @@ class Dino(GameObject):
     def duck(self):
         if not self.isJumping and not self.isDead:
             self.isDucking = True
-            self.height = 40
+            self.height = self.duckHeight
             self.y = self.groundY - self.height
     
     def stopDucking(self):
@@ -163,9 +183,11 @@ class Dino(GameObject):
                 self.x = 0
 
     def update(self, events=None):
+        self.tickCount += 1
+        
         # Animation update
         self.animationTimer += 1
-        if self.animationTimer >= 10:  # Change animation frame every 5 game ticks
+        if self.animationTimer >= self.animationInterval:
             self.animationTimer = 0
             self.state_frame_index = (self.state_frame_index + 1) % len(self.getStateFrames())
         
@@ -193,11 +215,11 @@ class Dino(GameObject):
             self.attackTotalFrames += 1
             
             # Begin attack sequence if not already in progress
-            if not self.attackInProgress and self.attackTotalFrames > 5:
+            if not self.attackInProgress and self.attackTotalFrames > 2:
                 self.attackInProgress = True
                 
             # Continue animation for full duration
-            if self.attackTotalFrames > 30:  # Extended duration to allow fire release and complete animation
+            if self.attackTotalFrames > 15:  # Extended duration to allow fire release and complete animation
                 self.isAttacking = False
                 self.attackInProgress = False
                 self.attackComplete = True
@@ -209,17 +231,6 @@ class Dino(GameObject):
             if self.fire_timer >= self.fire_delay:
                 self.should_create_fire = False
                 self.create_fire()
-                
-        # Update active fires
-        for fire in self.active_fires[:]:
-            fire.update()
-            if not fire.is_active:
-                self.active_fires.remove(fire)
-            
-        # Reset CURRENT fire count if all fires are gone
-        # This allows animation to play correctly but doesn't reset the total counter
-        if len(self.active_fires) == 0:
-            self.current_fire_count = 0
 
         # Handle invulnerability timer
         if self.isInvulnerable:
@@ -228,6 +239,23 @@ class Dino(GameObject):
                 self.isInvulnerable = False
                 self.invulnerabilityTimer = 0
 
+    def updateFires(self):
+        """Move the fires this dino has breathed; part of the projectiles stage"""
+        pool = getPool(self.app, "fires", Fire)
+        fires = []
+        for fire in self.active_fires:
+            fire.update()
+            if fire.is_active:
+                fires.append(fire)
+            else:
+                pool.release(fire)
+        self.active_fires = fires
+            
+        # Reset CURRENT fire count if all fires are gone
+        # This allows animation to play correctly but doesn't reset the total counter
+        if len(self.active_fires) == 0:
+            self.current_fire_count = 0
+
     def draw(self):        
         # Flash effect when invulnerable - only apply in battle mode (level 2)
         opacity = None
@@ -255,39 +283,28 @@ class Dino(GameObject):
             self.drawHealthBar()
 
     def drawRun(self, opacity=100):
-        frameIndex = self.state_frame_index % len(self.walking_frames)
-        
-        if self.isFacingRight:
-            drawImage(self.walking_frames[frameIndex], self.x, self.y, width=self.width, height=self.height, align='top-left', opacity=100)
-        else:
-            drawImage(self.left_walking_frames[frameIndex], self.x, self.y, width=self.width, height=self.height, align='top-left', opacity=100)
+        frames = self.getSizedFrames("walking")
+        frameIndex = self.state_frame_index % len(frames)
+        drawImage(frames[frameIndex], self.drawX, self.drawY, align='top-left', opacity=100)
 
     def drawJump(self, opacity=100):
-        if self.isFacingRight:
-            drawImage(self.idle_frames[0], self.x, self.y, width=self.width, height=self.height, align='top-left', opacity=100)
-        else:
-            drawImage(self.left_idle_frames[0], self.x, self.y, width=self.width, height=self.height, align='top-left', opacity=100)
+        drawImage(self.getSizedFrames("idle")[0], self.drawX, self.drawY, align='top-left', opacity=100)
 
     def drawDuck(self):
         pass
 
     def drawDead(self):
-        frameIndex = min(self.deathAnimationFrame, len(self.die_frames) - 1)
-        if self.isFacingRight:
-            drawImage(self.die_frames[frameIndex], self.x, self.y, width=self.width, height=self.height, align='top-left')
-        else:
-            drawImage(self.left_die_frames[frameIndex], self.x, self.y, width=self.width, height=self.height, align='top-left')
+        frames = self.getSizedFrames("die")
+        frameIndex = min(self.deathAnimationFrame, len(frames) - 1)
+        drawImage(frames[frameIndex], self.drawX, self.drawY, align='top-left')
 
     def drawIdle(self, opacity=100):
         if len(self.idle_frames) == 0:
             return
             
-        frameIndex = self.state_frame_index % len(self.idle_frames)
-        
-        if self.isFacingRight:
-            drawImage(self.idle_frames[frameIndex], self.x, self.y, width=self.width, height=self.height, align='top-left', opacity=100)
-        else:
-            drawImage(self.left_idle_frames[frameIndex], self.x, self.y, width=self.width, height=self.height, align='top-left', opacity=100)
+        frames = self.getSizedFrames("idle")
+        frameIndex = self.state_frame_index % len(frames)
+        drawImage(frames[frameIndex], self.drawX, self.drawY, align='top-left', opacity=100)
             
     def drawAttack(self, opacity=100):
         if len(self.attack_frames) == 0:
@@ -295,15 +312,13 @@ class Dino(GameObject):
             return
             
         # Make sure the frame index doesn't exceed the number of frames
-        frameIndex = min(self.state_frame_index, len(self.attack_frames) - 1)
+        frames = self.getSizedFrames("attack")
+        frameIndex = min(self.state_frame_index, len(frames) - 1)
         
         # Draw a visual indicator for debugging (uncomment if needed)
-        # drawLabel("ATTACK", self.x, self.y - 20, fill='red', bold=True)
+        # drawLabel("ATTACK", self.drawX, self.drawY - 20, fill='red', bold=True)
         
-        if self.isFacingRight:
-            drawImage(self.attack_frames[frameIndex], self.x, self.y, width=self.width, height=self.height, align='top-left', opacity=100)
-        else:
-            drawImage(self.left_attack_frames[frameIndex], self.x, self.y, width=self.width, height=self.height, align='top-left', opacity=100)
+        drawImage(frames[frameIndex], self.drawX, self.drawY, align='top-left', opacity=100)
 
     def startDeathAnimation(self):
         self.isDead = True
@@ -320,7 +335,8 @@ class Dino(GameObject):
         mouth_x = self.x + (self.width * 0.2 if self.isFacingRight else self.width)
         mouth_y = self.y + (self.height * 0.4)  # Position near mouth
         
-        fire = Fire(x=mouth_x, y=mouth_y, width=60, height=40, direction=direction)
+        fire = getPool(self.app, "fires", Fire).acquire(x=mouth_x, y=mouth_y, width=60, height=40,
+                                                        direction=direction, speed=self.fire_speed)
         self.active_fires.append(fire)
         self.current_fire_count += 1
         
@@ -328,6 +344,11 @@ class Dino(GameObject):
         if self.app.level != 2:
             self.total_fires_used += 1  # Increment permanent counter
 
+    def releaseFires(self):
+        """Drop every fire still out, handing them back to the pool"""
+        getPool(self.app, "fires", Fire).releaseAll(self.active_fires)
+        self.active_fires = []
+
     def getStateFrames(self):
         if self.isDead and len(self.die_frames) > 0:
             return self.die_frames if self.isFacingRight else self.left_die_frames
@@ -344,7 +365,7 @@ class Dino(GameObject):
             return False
         
         self.health -= amount
-        print(f"Player took {amount} damage! Health: {self.health}/{self.maxHealth}")
+        log.debug("Player took %s damage! Health: %s/%s", amount, self.health, self.maxHealth)
         
         # Make invulnerable briefly
         self.isInvulnerable = True
@@ -364,8 +385,8 @@ class Dino(GameObject):
         barHeight = 8
         
         # Position above the dino
-        barX = self.x + (self.width - barWidth) / 2
-        barY = self.y - 20
+        barX = self.drawX + (self.width - barWidth) / 2
+        barY = self.drawY - 20
         
         # Draw background
         drawRect(barX, barY, barWidth, barHeight, fill='darkRed')
@@ -1,56 +1,76 @@
 from Models.dino import Dino
-from cmu_graphics import *
-import random
+from Models.fire import Fire
+from Models.graphics import *
+from Models.pool import getPool
+from Models.rng import getStream
+from Models.log import getLogger
+import Models.database_manager as db
+
+log = getLogger("enemies")
 
 class EnemyDino(Dino):
+    __slots__ = ("targetDino", "damage", "battleConfig", "rng", "state", "stateTimer",
+                 "stateDuration", "thinkTimer")
+    
+    isEnemy = True
+    # Enemies were tuned with a slower, floatier jump than the player
+    gravity = 0.4
+    jumpForce = -12
+    thinkInterval = 30
+    
     def __init__(self, app, x, y):
         super().__init__(app, x, y)
         
+        # Load enemy-specific appearance
+        self.loadEnemyAppearance()
+    
+    def reset(self, app, x, y):
+        """Start over as a new enemy (enemies are pooled, see Models/pool.py)"""
+        self.app = app
+        self.place(x, y, 70, 70)
+        self.resetState()
+    
+    def resetState(self):
+        super().resetState()
+        app = self.app
+        
         # Position enemy for better visibility - closer to view
         # Keep x at most 200 pixels off the right edge
-        self.x = min(x, app.width + 200)
+        self.x = min(self.x, app.width + 200)
         
         # Enemy specific attributes
-        self.isEnemy = True
         self.targetDino = app.model.dino
         self.maxHealth = 100
         self.health = self.maxHealth
         self.damage = 20
         
         # Get battle settings
-        try:
-            import Models.database_manager as db
-            battle_settings = db.get_battle_settings()
-            self.damage = battle_settings.get('enemy_fire_damage', 15)
-        except:
-            self.damage = 15
+        self.battleConfig = db.get_battle_settings()
+        self.damage = self.battleConfig.enemy_fire_damage
         
         # AI behavior state
+        self.rng = getStream(app, "ai")
         self.state = "approach"
         self.stateTimer = 0
         self.stateDuration = 120
         self.thinkTimer = 0
-        self.thinkInterval = 30
         
-        # Load enemy-specific appearance
-        self.loadEnemyAppearance()
+        # Make enemy face player initially
+        self.isFacingRight = False
         
         # Debug print
-        print(f"Enemy dino created at ({self.x}, {self.y}), targeting player at ({self.targetDino.x}, {self.targetDino.y})")
+        log.debug("Enemy dino created at (%s, %s), targeting player at (%s, %s)",
+                  self.x, self.y, self.targetDino.x, self.targetDino.y)
     
     def loadEnemyAppearance(self):
-        # Make enemy face player initially
-        self.isFacingRight = False
-        
         # Print frame counts to ensure animations are loaded
-        print(f"Enemy loaded with {len(self.walking_frames)} walking frames, " +
-              f"{len(self.idle_frames)} idle frames, " +
-              f"{len(self.die_frames)} die frames, " +
-              f"{len(self.attack_frames)} attack frames")
+        log.debug("Enemy loaded with %d walking frames, %d idle frames, %d die frames, %d attack frames",
+                  len(self.walking_frames), len(self.idle_frames), len(self.die_frames),
+                  len(self.attack_frames))
         
         # Create default death frame if none exist
         if len(self.die_frames) == 0:
-            print("No death frames found for enemy! Creating default death frame.")
+            log.warning("No death frames found for enemy! Creating default death frame.")
             # Use any available frame as a fallback
             if len(self.idle_frames) > 0:
                 self.die_frames = [self.idle_frames[0]]
@@ -59,20 +79,9 @@ class EnemyDino(Dino):
                 self.die_frames = [self.walking_frames[0]]
                 self.left_die_frames = [self.left_walking_frames[0]]
     
-    def update(self, events=None):
-        # If dead, only update the death animation and nothing else
+    def updateAI(self):
+        """Decide what to do next; part of the ai stage"""
         if self.isDead:
-            # Update animation timer for death animation
-            self.animationTimer += 1
-            if self.animationTimer >= 10:
-                self.animationTimer = 0
-                self.deathAnimationFrame += 1
-                
-                # Check if death animation is complete
-                if self.deathAnimationFrame >= len(self.die_frames):
-                    self.isDeathAnimationPlaying = False
-                    self.deathAnimationComplete = True
-                    print("Enemy death animation complete, enemy will be removed.")
             return
         
         # Update AI state timers
@@ -88,6 +97,24 @@ class EnemyDino(Dino):
         if self.thinkTimer >= self.thinkInterval:
             self.think()
             self.thinkTimer = 0
+    
+    def update(self, events=None):
+        self.tickCount += 1
+        
+        # If dead, only update the death animation and nothing else
+        if self.isDead:
+            # Update animation timer for death animation
+            self.animationTimer += 1
+            if self.animationTimer >= 10:
+                self.animationTimer = 0
+                self.deathAnimationFrame += 1
+                
+                # Check if death animation is complete
+                if self.deathAnimationFrame >= len(self.die_frames):
+                    self.isDeathAnimationPlaying = False
+                    self.deathAnimationComplete = True
+                    log.debug("Enemy death animation complete, enemy will be removed.")
+            return
             
         # Handle jumping physics
         if self.isJumping:
@@ -105,12 +132,6 @@ class EnemyDino(Dino):
         if self.animationTimer >= 10:
             self.animationTimer = 0
             self.state_frame_index = (self.state_frame_index + 1) % len(self.getStateFrames())
-
-        # Update active fires
-        for fire in self.active_fires[:]:
-            fire.update()
-            if not fire.is_active:
-                self.active_fires.remove(fire)
                 
         # Handle attack progress
         if self.isAttacking:
@@ -133,7 +154,7 @@ class EnemyDino(Dino):
             if self.fire_timer >= 10:
                 self.should_create_fire = False
                 self.create_fire()
-                print("Enemy created fire!")
+                log.debug("Enemy created fire!")
     
     def think(self):
         # Skip if dead
@@ -157,13 +178,13 @@ class EnemyDino(Dino):
                     self.moveForward()
             else:
                 # Close enough to attack
-                if random.random() < 0.5:
+                if self.rng.random() < 0.5:
                     self.state = "attack"
                     self.stateTimer = 0
                 
         elif self.state == "attack":
             # Attack if player is in range and not too close
-            if abs_distance < 350 and random.random() < 0.6:
+            if abs_distance < 350 and self.rng.random() < 0.6:
                 # Trigger attack animation and fire creation
                 self.attack()
                 
@@ -194,7 +215,7 @@ class EnemyDino(Dino):
                 self.stateTimer = 0
         
         # Random jumps - less frequent to make aiming more predictable
-        if random.random() < 0.02:
+        if self.rng.random() < 0.02:
             self.jump()
             
     def attack(self):
@@ -212,19 +233,20 @@ class EnemyDino(Dino):
             self.should_create_fire = True
             self.fire_timer = 0
             
-            print(f"Enemy attacking! Creating fire in direction: {'right' if self.isFacingRight else 'left'}")
+            log.debug("Enemy attacking! Creating fire in direction: %s",
+                      'right' if self.isFacingRight else 'left')
             
     def chooseNewState(self):
         # Weight the state choices to favor attacking
         if self.state == "approach":
             # 80% chance to attack, 20% to retreat
-            if random.random() < 0.8:
+            if self.rng.random() < 0.8:
                 self.state = "attack"
             else:
                 self.state = "retreat"
         elif self.state == "attack":
             # 30% chance to keep attacking, 40% to approach, 30% to retreat
-            r = random.random()
+            r = self.rng.random()
             if r < 0.3:
                 self.state = "attack"
             elif r < 0.7:
@@ -233,18 +255,18 @@ class EnemyDino(Dino):
                 self.state = "retreat"
         else:  # retreat
             # 70% chance to approach again, 30% to attack from retreat
-            if random.random() < 0.7:
+            if self.rng.random() < 0.7:
                 self.state = "approach"
             else:
                 self.state = "attack"
             
         # Randomize duration based on state
         if self.state == "attack":
-            self.stateDuration = random.randint(60, 120)
+            self.stateDuration = self.rng.randint(60, 120)
         elif self.state == "retreat":
-            self.stateDuration = random.randint(30, 90)
+            self.stateDuration = self.rng.randint(30, 90)
         else:
-            self.stateDuration = random.randint(90, 180)
+            self.stateDuration = self.rng.randint(90, 180)
     
     def takeDamage(self, amount):
         # Don't take damage if already dead
@@ -253,15 +275,15 @@ class EnemyDino(Dino):
             
         # Apply damage
         self.health -= amount
-        print(f"Enemy took {amount} damage! Health: {self.health}/{self.maxHealth}")
+        log.debug("Enemy took %s damage! Health: %s/%s", amount, self.health, self.maxHealth)
         
         if self.health <= 0:
             self.health = 0
             self.isDead = True
             # Clear any active fires when dying
-            self.active_fires = []
+            self.releaseFires()
             self.startDeathAnimation()
-            print("Enemy has been defeated!")
+            log.info("Enemy has been defeated!")
             
         return self.isDead
     
@@ -270,8 +292,8 @@ class EnemyDino(Dino):
         barHeight = 8
         
         # Position above the dino
-        barX = self.x + (self.width - barWidth) / 2
-        barY = self.y - 20
+        barX = self.drawX + (self.width - barWidth) / 2
+        barY = self.drawY - 20
         
         # Draw background
         drawRect(barX, barY, barWidth, barHeight, fill='darkRed')
@@ -302,13 +324,11 @@ class EnemyDino(Dino):
         frameIndex = min(self.deathAnimationFrame, len(self.die_frames) - 1)
         
         if self.isFacingRight:
-            drawImage(self.die_frames[frameIndex], self.x, self.y, 
-                    width=self.width, height=self.height, align='left-top',
-                    opacity=70)
+            drawImage(self.die_frames[frameIndex], self.drawX, self.drawY, 
+                    align='left-top', opacity=70)
         else:
-            drawImage(self.left_die_frames[frameIndex], self.x, self.y, 
-                    width=self.width, height=self.height, align='left-top',
-                    opacity=70)
+            drawImage(self.left_die_frames[frameIndex], self.drawX, self.drawY, 
+                    align='left-top', opacity=70)
     
     def create_fire(self):
         # Create fire in front of enemy dino
@@ -317,10 +337,11 @@ class EnemyDino(Dino):
         mouth_y = self.y + (self.height * 0.4)
         
         # Create fire marked as enemy fire with is_enemy=True flag
-        from Models.fire import Fire
-        fire = Fire(x=mouth_x, y=mouth_y, width=60, height=40, direction=direction, is_enemy=True)
+        fire = getPool(self.app, "fires", Fire).acquire(x=mouth_x, y=mouth_y, width=60, height=40,
+                                                        direction=direction, is_enemy=True)
         self.active_fires.append(fire)
-        print(f"Enemy created fire at ({mouth_x}, {mouth_y}) going {'right' if direction > 0 else 'left'}")
+        log.debug("Enemy created fire at (%s, %s) going %s", mouth_x, mouth_y,
+                  'right' if direction > 0 else 'left')
     
     def startDeathAnimation(self):
         # Override parent method to add custom enemy death behavior
@@ -1,61 +1,84 @@
+from Models.collision import UniformGrid, findHits, findAllHits
 from Models.enemy_dino import EnemyDino
+from Models.events import EnemyDefeated, EventBus, LevelComplete, PlayerHit
+from Models.pool import getPool
+from Models.log import getLogger
 import Models.database_manager as db
-import random
+
+log = getLogger("enemies")
 
 class EnemyManager:
-    def __init__(self, app):
+    def __init__(self, app, events=None):
         self.app = app
         self.enemies = []
         
-        # Load battle settings
-        self.settings = db.get_battle_settings()
+        # Defeated enemies and level completion are published here (see Models/events.py)
+        self.events = events if events is not None else EventBus()
+        self.level_complete_sent = False
         
-        # Spawn enemies based on settings
-        self.max_enemies = self.settings.get('enemies_count', 3)
-        self.enemy_health = self.settings.get('life', 100)
-        self.player_fire_damage = self.settings.get('player_fire_damage', 25)
-        self.enemy_fire_damage = self.settings.get('enemy_fire_damage', 15)
-        self.enemy_damage = self.settings.get('damage', 20)
+        # Broad phase for fires hitting enemies (see Models/collision.py)
+        self.grid = UniformGrid()
+        
+        # Load battle settings
+        self.loadSettings()
         
         # Initialize tracking variables
         self.enemies_defeated = 0
         self.spawn_timer = 0
-        self.spawn_interval = self.settings.get('spawn_interval', 300)
         
-        print(f"EnemyManager initialized with app.level={app.level}")
+        log.debug("EnemyManager initialized with app.level=%s", app.level)
         
         # Spawn first enemy immediately if in level 2
         if app.level == 2:
-            print("Level 2 detected! Spawning initial enemy...")
+            log.debug("Level 2 detected! Spawning initial enemy...")
             self.spawn_enemy()
     
-    def update(self):
-        # Skip if not in battle mode (level 2)
-        if self.app.level != 2:
-            return
-        
+    def loadSettings(self):
+        self.applyConfig(db.get_battle_settings())
+    
+    def applyConfig(self, config):
+        """Spawn enemies based on the battle settings; enemies already out keep theirs"""
+        self.config = config
+        self.max_enemies = config.enemies_count
+        self.enemy_health = config.life
+        self.player_fire_damage = config.player_fire_damage
+        self.enemy_fire_damage = config.enemy_fire_damage
+        self.enemy_damage = config.damage
+        self.spawn_interval = config.spawn_interval
+    
+    def updateAI(self):
+        for enemy in self.enemies:
+            enemy.updateAI()
+    
+    def updateEnemies(self):
+        """Move and animate the enemies; part of the physics stage"""
+        for enemy in self.enemies:
+            enemy.update()
+    
+    def updateFires(self):
+        for enemy in self.enemies:
+            enemy.updateFires()
+    
+    def updateSpawning(self):
+        """Remove defeated enemies and bring in new ones"""
         # Check if we need to spawn first enemy - this helps when switching levels
         if len(self.enemies) == 0 and self.enemies_defeated == 0:
-            print("No enemies present in level 2! Spawning initial enemy...")
+            log.debug("No enemies present in level 2! Spawning initial enemy...")
             self.spawn_enemy()
             
-        # Update existing enemies and track ones to remove
-        enemies_to_remove = []
-        
+        # Keep the enemies still fighting, hand defeated ones back to the pool
+        enemies = []
         for enemy in self.enemies:
-            enemy.update()
-            
-            # Check for defeated enemies
             if enemy.isDead and enemy.isDeathAnimationFinished():
-                # Mark for removal instead of removing directly to avoid modifying list during iteration
-                enemies_to_remove.append(enemy)
-        
-        # Remove dead enemies outside the loop
-        for enemy in enemies_to_remove:
-            if enemy in self.enemies:
-                self.enemies.remove(enemy)
                 self.enemies_defeated += 1
-                print("here", enemy)
+                log.debug("Removed defeated enemy %s", enemy)
+                self.events.publish(EnemyDefeated(enemy))
+                self.release_enemy(enemy)
+            else:
+                enemies.append(enemy)
+        if len(enemies) < len(self.enemies):
+            self.enemies = enemies
+            self.check_level_complete()
 
         
         # Spawn new enemies if needed
@@ -66,9 +89,9 @@ class EnemyManager:
             self.spawn_enemy()
             self.spawn_timer = 0
         elif self.spawn_timer % 60 == 0:
-            print(f"Waiting to spawn enemy: timer={self.spawn_timer}/{self.spawn_interval}, " +
-                  f"enemies={len(self.enemies)}/{self.max_enemies}, " +
-                  f"total={self.enemies_defeated + len(self.enemies)}/{self.max_enemies}")
+            log.debug("Waiting to spawn enemy: timer=%s/%s, enemies=%d/%d, total=%d/%d",
+                      self.spawn_timer, self.spawn_interval, len(self.enemies), self.max_enemies,
+                      self.enemies_defeated + len(self.enemies), self.max_enemies)
     
     def spawn_enemy(self):
         # Position visibly on the right side of the screen
@@ -76,96 +99,83 @@ class EnemyManager:
         x = int(self.app.width * 0.8)
         y = self.app.groundY - 70
         
-        enemy = EnemyDino(self.app, x, y)
+        enemy = getPool(self.app, "enemies", EnemyDino).acquire(self.app, x, y)
         enemy.maxHealth = self.enemy_health
         enemy.health = enemy.maxHealth
         enemy.damage = self.enemy_damage
         
         self.enemies.append(enemy)
-        print(f"Spawned enemy at ({x}, {y}) with health {enemy.health}/{enemy.maxHealth}")
-        print(f"Current enemy count: {len(self.enemies)}, app.level={self.app.level}")
-        print(f"Enemy direction: facing {'right' if enemy.isFacingRight else 'left'}")
+        log.info("Spawned enemy at (%s, %s) with health %s/%s", x, y, enemy.health, enemy.maxHealth)
+        log.debug("Current enemy count: %d, app.level=%s", len(self.enemies), self.app.level)
+        log.debug("Enemy direction: facing %s", 'right' if enemy.isFacingRight else 'left')
         
         # Check if enemy is initialized correctly
         if hasattr(enemy, 'walking_frames') and len(enemy.walking_frames) > 0:
-            print(f"Enemy has {len(enemy.walking_frames)} walking frames")
+            log.debug("Enemy has %d walking frames", len(enemy.walking_frames))
         else:
-            print("Warning: Enemy has no walking frames")
+            log.warning("Enemy has no walking frames")
     
-    def check_collision_with_fires(self, fires):
+    def release_enemy(self, enemy):
+        enemy.releaseFires()
+        getPool(self.app, "enemies", EnemyDino).release(enemy)
+    
+    def release_enemies(self):
+        """Hand every enemy (and its fires) back to the pools"""
         for enemy in self.enemies:
-            for fire in fires:
-                if fire.is_active and self.check_fire_collision(fire, enemy):
-                    # Damage enemy and deactivate fire
-                    enemy.takeDamage(self.player_fire_damage)
-                    fire.is_active = False
-                    print(f"Enemy hit! Health: {enemy.health}/{enemy.maxHealth}")
+            self.release_enemy(enemy)
+        self.enemies = []
     
-    def check_fire_collision(self, fire, enemy):
-        # Simple rectangle collision check
-        fireLeft = fire.x - fire.width/2
-        fireRight = fire.x + fire.width/2
-        fireTop = fire.y - fire.height/2
-        fireBottom = fire.y + fire.height/2
-        
-        enemyLeft = enemy.x
-        enemyRight = enemy.x + enemy.width
-        enemyTop = enemy.y
-        enemyBottom = enemy.y + enemy.height
-        
-        # Check for overlap
-        if (fireRight >= enemyLeft and 
-            fireLeft <= enemyRight and
-            fireBottom >= enemyTop and
-            fireTop <= enemyBottom):
-            return True
-            
-        return False
+    def check_collision_with_fires(self, fires):
+        # Fires that hit an enemy, earliest impact first (see Models/collision.py)
+        for i, j in findHits(self.grid, self.enemies, fires, byImpact=True):
+            enemy = self.enemies[i]
+            fire = fires[j]
+            if fire.is_active:
+                # Damage enemy and deactivate fire
+                enemy.takeDamage(self.player_fire_damage)
+                fire.is_active = False
+                log.debug("Enemy hit! Health: %s/%s", enemy.health, enemy.maxHealth)
     
     def check_collision_with_player(self, player):
-        for enemy in self.enemies:
-            # Skip if enemy is dead
-            if enemy.isDead:
-                continue
-                
-            # Only check collision during attack state
-            if enemy.state == "attack":
-                # Simple rectangle collision
-                if (player.x < enemy.x + enemy.width and
-                    player.x + player.width > enemy.x and
-                    player.y < enemy.y + enemy.height and
-                    player.y + player.height > enemy.y):
-                    
-                    # Check if enemy is actively attacking (has fires)
-                    if len(enemy.active_fires) > 0:
-                        # Damage player based on enemy's damage value
-                        if hasattr(player, 'takeDamage'):
-                            player.takeDamage(enemy.damage)
+        # Only enemies that are alive and attacking can hurt on contact
+        attackers = [enemy for enemy in self.enemies
+                     if not enemy.isDead and enemy.state == "attack"]
+        for i, j in findAllHits(attackers, [player]):
+            enemy = attackers[i]
+            # Check if enemy is actively attacking (has fires)
+            if len(enemy.active_fires) > 0:
+                # Damage player based on enemy's damage value
+                if hasattr(player, 'takeDamage'):
+                    health = player.health
+                    player.takeDamage(enemy.damage)
+                    if player.health < health:
+                        self.events.publish(PlayerHit(enemy.damage, enemy))
     
     def draw(self):
         for enemy in self.enemies:
             enemy.draw()
     
+    def check_level_complete(self):
+        """Publish LevelComplete the first time every enemy has been defeated"""
+        if not self.level_complete_sent and self.all_enemies_defeated():
+            self.level_complete_sent = True
+            self.events.publish(LevelComplete(self.app.level))
+    
     def all_enemies_defeated(self):
         return self.enemies_defeated >= self.max_enemies and len(self.enemies) == 0 
         
     def reset_enemies(self):
         """Reset the enemy manager state when starting a new game or level"""
         # Clear all existing enemies
-        self.enemies = []
+        self.release_enemies()
         
         # Reset counters
         self.enemies_defeated = 0
         self.spawn_timer = 0
+        self.level_complete_sent = False
         
         # Reload settings in case they changed
-        self.settings = db.get_battle_settings()
-        self.max_enemies = self.settings.get('enemies_count', 3)
-        self.enemy_health = self.settings.get('life', 100)
-        self.player_fire_damage = self.settings.get('player_fire_damage', 25)
-        self.enemy_fire_damage = self.settings.get('enemy_fire_damage', 15)
-        self.enemy_damage = self.settings.get('damage', 20)
-        self.spawn_interval = self.settings.get('spawn_interval', 300)
+        self.loadSettings()
         
         # Spawn initial enemy if in level 2
         if self.app.level == 2:
@@ -1,6 +1,7 @@
-from cmu_graphics import *
-import random
-from PIL import Image
+from Models.base_model import GameObject
+from Models.graphics import *
+from Models.rng import getStream
+from Models.sprite_cache import sprites
 
 class Environment:
     def __init__(self, app):
@@ -15,23 +16,45 @@ class Environment:
         self.skyColor = rgb(16, 42, 84)  # Dark blue
         self.groundColor = rgb(83, 83, 83)  # Dark gray
         self.cloudColor = rgb(255, 255, 255)  # White
-        self.cloudSpeed = 0.8
+        self.cloudSpeed = 1.6
             
         # Clouds
+        self.rng = getStream(app, "cosmetics")
         self.clouds = []
         for i in range(3):
             # randomly placed from the left side of the screen
-            x = random.randint(0, self.width)
+            x = self.rng.randint(0, self.width)
             # randomly placed in the sky (50 -> 150 height)
-            y = random.randint(50, 150)
-            size = random.randint(20, 40)
+            y = self.rng.randint(50, 150)
+            size = self.rng.randint(20, 40)
             self.clouds.append((x, y, size))
 
         # Ground animation
-        bgImage = Image.open('assets/ground.png')
-        self.groundImg = CMUImage(bgImage)
+        self.groundImg = sprites.getImage('assets/ground.png', size=(self.width, self.groundHeight))
         self.groundX = 0
-        self.groundSpeed = 2  # Speed of ground movement
+        self.groundSpeed = 4  # Speed of ground movement
+        
+        self.savePosition()
+    
+    def savePosition(self):
+        """Called at the start of every tick; scenery is drawn between ticks like GameObject"""
+        self.prevGroundX = self.groundX
+        self.prevCloudXs = [x for x, y, size in self.clouds]
+    
+    def getDrawGroundX(self):
+        moved = self.groundX - self.prevGroundX
+        if moved > 0:
+            # Wrapped back to 0 this tick; the strip repeats every width
+            moved -= self.width
+        return self.prevGroundX + moved * GameObject.renderAlpha
+    
+    def getDrawCloudX(self, i):
+        x = self.clouds[i][0]
+        prevX = self.prevCloudXs[i]
+        if x > prevX:
+            # Wrapped around to the right this tick, off screen either way
+            return x
+        return prevX + (x - prevX) * GameObject.renderAlpha
     
     def update(self):
         # Move clouds
@@ -41,7 +64,7 @@ class Environment:
             x -= self.cloudSpeed
             if x < -50:
                 x = self.width + 50
-                y = random.randint(50, 150)
+                y = self.rng.randint(50, 150)
             self.clouds[i] = (x, y, size)
             
         # Update ground position for scrolling effect
@@ -57,12 +80,16 @@ class Environment:
         drawRect(0, 0, self.width, self.height, fill=self.skyColor)
         
         # Draw clouds
-        for x, y, size in self.clouds:
-            self.drawCloud(x, y, size, self.cloudColor)
+        for i, (x, y, size) in enumerate(self.clouds):
+            self.drawCloud(self.getDrawCloudX(i), y, size, self.cloudColor)
         
-        # Draw scrolling ground
-        drawImage(self.groundImg, self.groundX, self.groundY, width=self.app.width, height=self.groundHeight)
-        drawImage(self.groundImg, self.groundX + self.app.width, self.groundY, width=self.app.width, height=self.groundHeight)
+        # Draw scrolling ground (a plain strip if the image failed to load)
+        if self.groundImg is None:
+            drawRect(0, self.groundY, self.width, self.groundHeight, fill=self.groundColor)
+            return
+        groundX = self.getDrawGroundX()
+        drawImage(self.groundImg, groundX, self.groundY)
+        drawImage(self.groundImg, groundX + self.width, self.groundY)
     
     def drawCloud(self, x, y, size, color):
         # Simple clouds using circles
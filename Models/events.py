@@ -0,0 +1,62 @@
+"""Game events, published when something happens instead of polled every tick.
+
+Each game model has an EventBus. The parts of the game that make
+something happen (obstacles passing or getting destroyed, enemies
+falling, the player being hit) publish an event; handlers subscribed to
+that event type run right away, in the order they subscribed. The bus
+counts every event it sees, so "how many so far" is a lookup, not a scan.
+
+Level completion is one of these: the obstacle and enemy managers check
+their counters when they change and publish LevelComplete once, and the
+model ends the level when it hears it.
+"""
+
+class GameEvent:
+    pass
+
+class ObstaclePassed(GameEvent):
+    """An obstacle left the screen without hitting the player"""
+    def __init__(self, obstacleType):
+        self.obstacleType = obstacleType
+
+class ObstacleDestroyed(GameEvent):
+    """The player's fire destroyed an obstacle"""
+    def __init__(self, obstacleType):
+        self.obstacleType = obstacleType
+
+class EnemyDefeated(GameEvent):
+    """An enemy died and finished its death animation"""
+    def __init__(self, enemy):
+        self.enemy = enemy
+
+class PlayerHit(GameEvent):
+    """The player was hit, by enemy fire or by an attacking enemy"""
+    def __init__(self, damage, source):
+        self.damage = damage
+        self.source = source
+
+class LevelComplete(GameEvent):
+    def __init__(self, level):
+        self.level = level
+
+class EventBus:
+    def __init__(self):
+        self.handlers = {}  # event type -> handlers, in subscription order
+        self.counts = {}  # event type -> times published
+
+    def subscribe(self, eventType, handler):
+        self.handlers.setdefault(eventType, []).append(handler)
+
+    def unsubscribe(self, eventType, handler):
+        if handler in self.handlers.get(eventType, ()):
+            self.handlers[eventType].remove(handler)
+
+    def publish(self, event):
+        eventType = type(event)
+        self.counts[eventType] = self.counts.get(eventType, 0) + 1
+        for handler in self.handlers.get(eventType, ()):
+            handler(event)
+
+    def count(self, eventType):
+        """How many events of this type were published"""
+        return self.counts.get(eventType, 0)
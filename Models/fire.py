@@ -1,15 +1,27 @@
-from cmu_graphics import *
+from Models.graphics import *
 from Models.base_model import GameObject
-from PIL import Image
-import os
+from Models.sprite_cache import sprites
 
 class Fire(GameObject):
+    __slots__ = ("direction", "animation_frame", "is_active", "animation_timer", "speed",
+                 "start_x", "max_distance", "is_enemy", "offsetX", "fire_frames", "total_frames")
+    
+    animation_speed = 3  # Animation steps per frame
+    # Player fires were tuned when they were updated twice a tick, so they
+    # keep taking two animation steps per tick; enemy fires take one
+    player_animation_steps = 2
+    enemy_animation_steps = 1
+    
     def __init__(self, x, y, width=60, height=40, direction=1, speed=8, distance=200, is_enemy=False):
         super().__init__(x, y, width, height)
+        self.reset(x, y, width, height, direction, speed, distance, is_enemy)
+    
+    def reset(self, x, y, width=60, height=40, direction=1, speed=8, distance=200, is_enemy=False):
+        """Start over as a new fire (fires are pooled, see Models/pool.py)"""
+        self.place(x, y, width, height)
         self.direction = direction
         self.animation_frame = 0
         self.is_active = True
-        self.animation_speed = 3
         self.animation_timer = 0
         self.speed = speed
         self.start_x = x
@@ -23,33 +35,21 @@ class Fire(GameObject):
         self.offsetX = 40 if direction > 0 else -40
         self.x += self.offsetX
         self.start_x = self.x
+        self.prevX = self.x
         
     def loadFrames(self):
-        self.fire_frames = []
-        fire_dir = 'assets/split_fire'
-        
-        if os.path.exists(fire_dir):
-            files = [f for f in os.listdir(fire_dir) if f.endswith('.gif')]
-            files.sort(key=lambda x: int(x.split('.')[0]) if x.split('.')[0].isdigit() else 0)
-            
-            for file in files:
-                file_path = os.path.join(fire_dir, file)
-                try:
-                    image = Image.open(file_path)
-                    
-                    # Flip the image if facing left
-                    if self.direction < 0:
-                        image = image.transpose(Image.FLIP_LEFT_RIGHT)
-                        
-                    self.fire_frames.append(CMUImage(image))
-                except Exception as e:
-                    print(f"Error loading fire image: {e}")
-        
+        # Left-facing fire uses the pre-mirrored frames from the shared cache
+        self.fire_frames = sprites.getFrames('assets/split_fire', flipped=self.direction < 0,
+                                             size=(self.width, self.height))
         self.total_frames = len(self.fire_frames)
-        print(f"Loaded {self.total_frames} fire frames")
+    
+    def boxAt(self, x, y):
+        """Fires are drawn centred on x, y"""
+        return (x - self.width/2, y - self.height/2, x + self.width/2, y + self.height/2)
     
     def update(self):
-        self.animation_timer += 1
+        self.tickCount += 1
+        self.animation_timer += self.enemy_animation_steps if self.is_enemy else self.player_animation_steps
         
         # Move fire in the direction it's facing
         self.x += self.speed * self.direction
@@ -59,8 +59,9 @@ class Fire(GameObject):
         if current_distance >= self.max_distance:
             self.is_active = False
         
-        # Advance frame every animation_speed frames
-        if self.animation_timer % self.animation_speed == 0:
+        # Advance a frame every animation_speed steps
+        if self.animation_timer >= self.animation_speed:
+            self.animation_timer -= self.animation_speed
             self.animation_frame += 1
             
             # Loop the animation while moving
@@ -77,10 +78,8 @@ class Fire(GameObject):
         # Draw the fire - use red tint for enemy fire
         if self.is_enemy:
             # Draw with red tint for enemy fire
-            drawImage(self.fire_frames[frame_index], self.x, self.y, 
-                    width=self.width, height=self.height, align='center', opacity=100, 
-                    rotateAngle=0) 
+            drawImage(self.fire_frames[frame_index], self.drawX, self.drawY, 
+                    align='center', opacity=100, rotateAngle=0) 
         else:
             # Normal fire for player
-            drawImage(self.fire_frames[frame_index], self.x, self.y, 
-                    width=self.width, height=self.height, align='center') 
\ No newline at end of file
+            drawImage(self.fire_frames[frame_index], self.drawX, self.drawY, align='center') 
\ No newline at end of file
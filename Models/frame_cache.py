@@ -0,0 +1,138 @@
+"""On-disk cache of decoded frames, so warm starts skip GIF decoding.
+
+The cache is a single versioned file: a small header, a JSON index and
+the raw RGBA pixels of every frame. Each entry remembers the mtime and
+size of the source files it was decoded from and is only used while
+they are unchanged, so editing an asset re-decodes just that animation.
+The pixel data is memory-mapped, frames are created straight from it.
+Lookups and additions are safe to make from decoding threads.
+"""
+from PIL import Image
+from Models.log import getLogger
+import json
+import mmap
+import os
+import struct
+import threading
+
+log = getLogger("assets")
+
+FRAME_CACHE_FILE = ".cache/frames.bin"
+FRAME_CACHE_MAGIC = b"DRFC"
+FRAME_CACHE_VERSION = 1
+HEADER = struct.Struct("<4sII")  # magic, version, index length
+
+def sourceSignature(paths):
+    """(name, mtime, size) of every source file, used to detect changes"""
+    signature = []
+    for path in paths:
+        stat = os.stat(path)
+        signature.append([path, stat.st_mtime_ns, stat.st_size])
+    return signature
+
+class FrameDiskCache:
+    def __init__(self, path=FRAME_CACHE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.index = {}
+        self.data = None
+        self.dataStart = 0
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as file:
+                header = file.read(HEADER.size)
+                magic, version, indexLength = HEADER.unpack(header)
+                if magic != FRAME_CACHE_MAGIC or version != FRAME_CACHE_VERSION:
+                    log.warning("Ignoring frame cache %s: written by another version", self.path)
+                    return
+                self.index = json.loads(file.read(indexLength))
+                self.dataStart = HEADER.size + indexLength
+                self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception as e:
+            log.error("Error loading frame cache %s: %s", self.path, e)
+            self.index = {}
+            self.data = None
+
+    def getFrames(self, key, sources):
+        """Return the cached RGBA frames for key, or None if missing or stale"""
+        entry = self.index.get(key)
+        if entry is None or self.data is None or entry["sources"] != sourceSignature(sources):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits += 1
+        frames = []
+        for offset, width, height in entry["frames"]:
+            start = self.dataStart + offset
+            pixels = memoryview(self.data)[start:start + width * height * 4]
+            frames.append(Image.frombuffer("RGBA", (width, height), pixels, "raw", "RGBA", 0, 1))
+        return frames
+
+    def putFrames(self, key, sources, frames):
+        """Remember freshly decoded frames, written out by save()"""
+        entry = (sourceSignature(sources), [frame.convert("RGBA") for frame in frames])
+        with self.lock:
+            self.pending[key] = entry
+
+    def save(self):
+        """Rewrite the cache file with every valid entry, if anything changed"""
+        with self.lock:
+            pending = self.pending
+            self.pending = {}
+        if not pending:
+            return
+
+        index = {}
+        chunks = []
+        offset = 0
+
+        def addEntry(key, sources, frameData):
+            nonlocal offset
+            entryFrames = []
+            for width, height, pixels in frameData:
+                entryFrames.append([offset, width, height])
+                chunks.append(pixels)
+                offset += len(pixels)
+            index[key] = {"sources": sources, "frames": entryFrames}
+
+        # Keep existing entries that were not replaced
+        for key, entry in self.index.items():
+            if key in pending or self.data is None:
+                continue
+            frameData = []
+            for frameOffset, width, height in entry["frames"]:
+                start = self.dataStart + frameOffset
+                frameData.append((width, height, self.data[start:start + width * height * 4]))
+            addEntry(key, entry["sources"], frameData)
+
+        for key, (sources, frames) in pending.items():
+            addEntry(key, sources, [(frame.width, frame.height, frame.tobytes()) for frame in frames])
+
+        indexBytes = json.dumps(index).encode()
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        # Write next to the cache and swap it in, so a crash never leaves a partial file
+        tempPath = self.path + ".tmp"
+        try:
+            with open(tempPath, "wb") as file:
+                file.write(HEADER.pack(FRAME_CACHE_MAGIC, FRAME_CACHE_VERSION, len(indexBytes)))
+                file.write(indexBytes)
+                for chunk in chunks:
+                    file.write(chunk)
+            os.replace(tempPath, self.path)
+        except OSError as e:
+            log.error("Error saving frame cache %s: %s", self.path, e)
+            return
+
+        self.load()
@@ -1,10 +1,15 @@
 from Models.base_model import GameModel
+from Models.collision import UniformGrid, findHits
 from Models.dino import Dino
 from Models.environment import Environment
-from Models.obstacles import ObstacleManager
+from Models.events import EventBus, LevelComplete, ObstacleDestroyed, PlayerHit
+from Models.obstacles import createObstacleManager
 from Models.enemy_manager import EnemyManager
+from Models.log import getLogger
 import Models.database_manager as db
 
+log = getLogger("game")
+
 class GameModelManager(GameModel):
     def __init__(self, app):
         super().__init__(app)
@@ -16,71 +21,209 @@ class GameModelManager(GameModel):
         self.dino.isRunning = True
         self.dino.isIdle = False
         
+        # Keys held down during the current tick, set by the GameController
+        self.heldKeys = set()
+        
+        # What happens in the game is published here (see Models/events.py)
+        self.events = EventBus()
+        self.events.subscribe(LevelComplete, self.onLevelComplete)
+        # Completion heard while paused or on a menu, applied once play resumes
+        self.levelCompletePending = False
+        
         self.environment = Environment(app)
-        self.obstacleManager = ObstacleManager(app)
-        self.enemyManager = EnemyManager(app)
+        self.obstacleManager = createObstacleManager(app, self.events)
+        self.enemyManager = EnemyManager(app, self.events)
+        
+        # Broad phase for enemy fires hitting the player (see Models/collision.py)
+        self.enemyFireGrid = UniformGrid()
         
         self.score = 0
-        self.highScore = db.get_highscore()
+        self.highScores = db.get_highscore_store()
+        self.highScore = self.highScores.value
+        
+        # Each run is added to the player ranking once, when it ends
+        self.playerName = db.get_player_name()
+        self.runRecorded = False
+        
+        # Headless runs (soak tests, balancing) and replays leave the saved scores alone
+        self.keepScores = not ((hasattr(app, 'isHeadless') and app.isHeadless) or
+                               hasattr(app, 'replayPlayer'))
         
         self.currentLevel = app.level
 
-    def update(self):
-        super().update()
-        
-        if hasattr(self, 'dino') and self.dino is not None:
-            # put to running state when game is active
-            if not self.app.isPaused and not self.app.isGameOver and not self.app.isStartScreen:
-                if not self.dino.isDead and not self.dino.isJumping:
-                    self.dino.isRunning = True
-                    self.dino.isIdle = False
-            
-            # Update dino
-            self.dino.update()
+    @classmethod
+    def registerSystems(cls, pipeline):
+        """Add the model's per-tick systems to a TickPipeline, each exactly once"""
+        pipeline.register("input", "held keys", cls.applyHeldKeys)
+        pipeline.register("input", "dino running state", cls.updateRunningState)
+        pipeline.register("ai", "enemy ai", cls.updateEnemyAI)
+        pipeline.register("physics", "dino", cls.updateDino)
+        pipeline.register("physics", "environment", cls.updateEnvironment)
+        pipeline.register("physics", "obstacles", cls.updateObstacles)
+        pipeline.register("physics", "enemies", cls.updateEnemies)
+        pipeline.register("projectiles", "dino fires", cls.updateDinoFires)
+        pipeline.register("projectiles", "enemy fires", cls.updateEnemyFires)
+        pipeline.register("collisions", "dino vs obstacles", cls.updateObstacleCollisions)
+        pipeline.register("collisions", "battle", cls.updateBattleCollisions)
+        pipeline.register("spawning", "obstacles", cls.updateObstacleSpawning)
+        pipeline.register("spawning", "enemies", cls.updateEnemySpawning)
+        pipeline.register("scoring", "score", cls.updateScore)
+        pipeline.register("scoring", "game over", cls.checkGameOver)
+        pipeline.register("scoring", "level complete", cls.applyPendingLevelComplete)
+        pipeline.register("scoring", "ranking", cls.recordFinishedRun, always=True)
+    
+    def applyHeldKeys(self):
+        # Once per tick, so holding a key moves the dino as fast at any frame rate
+        keys = self.heldKeys
+        if 'right' in keys or 'd' in keys:
+            self.dino.moveForward()
+        if 'left' in keys or 'a' in keys:
+            self.dino.moveBack()
+        if 'down' in keys or 's' in keys:
+            self.dino.duck()
+        # No attack on key hold - only on key press
+    
+    def updateRunningState(self):
+        # put to running state when game is active
+        if not self.dino.isDead and not self.dino.isJumping:
+            self.dino.isRunning = True
+            self.dino.isIdle = False
+    
+    def updateEnemyAI(self):
+        if self.app.level == 2:
+            self.enemyManager.updateAI()
+    
+    def updateDino(self):
+        self.dino.update()
+    
+    def updateEnvironment(self):
+        self.environment.update()
+    
+    def updateObstacles(self):
+        if self.app.level == 1:
+            self.obstacleManager.updateObstacles()
+    
+    def updateEnemies(self):
+        if self.app.level == 2:
+            self.enemyManager.updateEnemies()
+    
+    def updateDinoFires(self):
+        self.dino.updateFires()
+    
+    def updateEnemyFires(self):
+        if self.app.level == 2:
+            self.enemyManager.updateFires()
+    
+    def updateObstacleCollisions(self):
+        # A dying dino no longer collides, and its fires stop hitting things
+        if not self.dino.isDead and self.checkCollisions():
+            self.dino.startDeathAnimation()
+    
+    def updateBattleCollisions(self):
+        if self.app.level != 2:
+            return
+        
+        # Check for enemy-fire collisions
+        if hasattr(self.dino, 'active_fires') and self.dino.active_fires:
+            self.enemyManager.check_collision_with_fires(self.dino.active_fires)
         
-        # Update environment
-        if hasattr(self, 'environment'):
-            self.environment.update()
+        # Check for enemy-player collisions and enemy fire-player collisions
+        self.enemyManager.check_collision_with_player(self.dino)
         
-        # Update obstacles or enemies based on level
+        # Check enemy fire collisions with player, looking only at fires near the player
+        enemyFires = [(enemy, fire) for enemy in self.enemyManager.enemies for fire in enemy.active_fires]
+        fires = [fire for enemy, fire in enemyFires]
+        for i, j in findHits(self.enemyFireGrid, fires, [self.dino]):
+            enemy, fire = enemyFires[i]
+            # Damage player and deactivate fire
+            if hasattr(self.dino, 'takeDamage'):
+                health = self.dino.health
+                self.dino.takeDamage(enemy.damage)
+                log.debug("Player hit by enemy fire! Health: %s/%s", self.dino.health, self.dino.maxHealth)
+                if self.dino.health < health:
+                    self.events.publish(PlayerHit(enemy.damage, fire))
+            fire.is_active = False
+    
+    def updateObstacleSpawning(self):
         if self.app.level == 1:
-            # Level 1: Use obstacles
-            if hasattr(self, 'obstacleManager'):
-                self.obstacleManager.update()
-        else:
-            # Level 2: Use enemies
-            if hasattr(self, 'enemyManager'):
-                self.enemyManager.update()
-                
-                # Check for enemy-fire collisions
-                if hasattr(self.dino, 'active_fires') and self.dino.active_fires:
-                    self.enemyManager.check_collision_with_fires(self.dino.active_fires)
-                
-                # Check for enemy-player collisions and enemy fire-player collisions
-                self.enemyManager.check_collision_with_player(self.dino)
-                
-                # Check enemy fire collisions with player
-                for enemy in self.enemyManager.enemies:
-                    if hasattr(enemy, 'active_fires') and enemy.active_fires:
-                        for fire in enemy.active_fires:
-                            if self.check_enemy_fire_collision_with_player(fire, self.dino):
-                                # Damage player and deactivate fire
-                                if hasattr(self.dino, 'takeDamage'):
-                                    self.dino.takeDamage(enemy.damage)
-                                    print(f"Player hit by enemy fire! Health: {self.dino.health}/{self.dino.maxHealth}")
-                                fire.is_active = False
-                
-                # Check if all enemies defeated to complete the level
-                if self.enemyManager.all_enemies_defeated():
-                    self.app.isLevelComplete = True
-        
-        # Check for level completion
-        self.checkLevelCompletion()
-        
-        # Update score and high score
+            self.obstacleManager.updateSpawning()
+    
+    def updateEnemySpawning(self):
+        if self.app.level == 2:
+            self.enemyManager.updateSpawning()
+    
+    def updateScore(self):
+        self.score += 0.1
+        
+        # Update high score
         if self.score > self.highScore:
             self.highScore = self.score
-            db.update_highscore(int(self.score))
+            if self.keepScores:
+                self.highScores.submit(int(self.score))
+    
+    def checkGameOver(self):
+        if self.dino.isDead and self.dino.isDeathAnimationFinished():
+            self.app.isGameOver = True
+            self.highScores.request_flush()
+    
+    def applyPendingLevelComplete(self):
+        # Only runs while playing, so a completion heard while paused lands on resume
+        if self.levelCompletePending and not self.app.isGameOver:
+            self.levelCompletePending = False
+            self.app.isLevelComplete = True
+    
+    def recordFinishedRun(self):
+        if self.app.isGameOver or self.app.isLevelComplete:
+            self.recordRun()
+    
+    def getEntities(self):
+        """Every moving object in the game"""
+        yield self.dino
+        yield from self.dino.active_fires
+        yield from self.obstacleManager.obstacles
+        for enemy in self.enemyManager.enemies:
+            yield enemy
+            yield from enemy.active_fires
+    
+    def releaseObjects(self):
+        """Hand pooled objects back when this game is thrown away for a new one"""
+        self.dino.releaseFires()
+        self.obstacleManager.releaseObstacles()
+        self.enemyManager.release_enemies()
+    
+    def savePositions(self):
+        """Remember where everything was before this tick, for interpolated drawing"""
+        self.dino.savePosition()
+        self.environment.savePosition()
+        for fire in self.dino.active_fires:
+            fire.savePosition()
+        self.obstacleManager.savePositions()
+        for enemy in self.enemyManager.enemies:
+            enemy.savePosition()
+            for fire in enemy.active_fires:
+                fire.savePosition()
+    
+    def applySettings(self, path, config):
+        """Hand settings reloaded from path to the parts of the game using them"""
+        if path == db.get_level_file(self.obstacleManager.currentLevel):
+            self.obstacleManager.applyConfig(config)
+        if path == db.get_level_file(self.app.level):
+            self.dino.applyLevelConfig(config)
+        if path == db.BATTLE_FILE:
+            self.enemyManager.applyConfig(config)
+        
+        # New counts can finish the level without anything else happening
+        if self.app.level == 1:
+            self.obstacleManager.checkCompletion()
+        elif self.app.level == 2:
+            self.enemyManager.check_level_complete()
+    
+    def recordRun(self):
+        """Add the finished run to the player ranking"""
+        if self.runRecorded or not self.keepScores:
+            return
+        self.runRecorded = True
+        db.get_ranking_store().record_score(self.playerName, self.app.level, int(self.score))
     
     def getScoreText(self):
         return f"Score: {int(self.score)}"
@@ -89,8 +232,7 @@ class GameModelManager(GameModel):
         return f"HI: {int(self.highScore)}"
         
     def getLevelText(self):
-        level_settings = db.get_level_settings(self.currentLevel)
-        return f"Level: {level_settings['name']}"
+        return f"Level: {self.obstacleManager.config.name}"
 
     def draw(self):
         self.dino.draw()
@@ -103,94 +245,55 @@ class GameModelManager(GameModel):
         else:
             # Level 2: Draw enemies
             if hasattr(self, 'enemyManager') and self.app.level == 2:
-                # Make sure enemy manager updates properly
-                if len(self.enemyManager.enemies) == 0 and self.enemyManager.enemies_defeated == 0:
-                    print("Game model detected no enemies in level 2, spawning enemy...")
-                    self.enemyManager.spawn_enemy()
                 self.enemyManager.draw()
-                print(f"Drawing {len(self.enemyManager.enemies)} enemies from game model")
 
     def checkCollisions(self):
         """Check for collisions between dino and obstacles or enemies"""
         # Level 1: Check obstacle collisions
         if self.app.level == 1:
-            for obstacle in self.obstacleManager.obstacles:
-                # Check dino collision with obstacles
-                if self.dino.collidesWith(obstacle):
-                    # Set dying state and start animation
-                    self.dino.isDead = True
-                    self.dino.isRunning = False
-                    self.dino.isIdle = False
-                    return True
+            obstacles = self.obstacleManager.obstacles
+            fires = self.dino.active_fires
+            
+            # Hitting an obstacle ends the check; fires only get to the obstacles before it
+            dinoHits = findHits(self.obstacleManager.grid, obstacles, [self.dino])
+            dinoHit = dinoHits[0][0] if dinoHits else len(obstacles)
+            
+            # Earliest impacts first, so a fast fire stops at the first obstacle in its way
+            for i, j in findHits(self.obstacleManager.grid, obstacles, fires, byImpact=True):
+                if i >= dinoHit:
+                    continue
+                obstacle = obstacles[i]
+                fire = fires[j]
+                if fire.is_active:
+                    # Mark obstacle as dead when hit by fire
+                    obstacle.isDead = True
+                    obstacle.counted = True  # Count it as passed
+                    self.events.publish(ObstacleDestroyed(obstacle.type))
                     
-                # Check if any active fire hits the obstacle
-                for fire in self.dino.active_fires:
-                    if fire.is_active and self.checkFireCollision(fire, obstacle):
-                        # Mark obstacle as dead when hit by fire
-                        obstacle.isDead = True
-                        obstacle.counted = True  # Count it as passed
-                        
-                        # Also deactivate the fire upon hit
-                        fire.is_active = False
+                    # Also deactivate the fire upon hit
+                    fire.is_active = False
+            
+            if dinoHit < len(obstacles):
+                # Set dying state and start animation
+                self.dino.isDead = True
+                self.dino.isRunning = False
+                self.dino.isIdle = False
+                return True
         
         # No collision
         return False
         
-    def checkFireCollision(self, fire, obstacle):
-        """Check if fire collides with an obstacle"""
-        # Simple rectangle collision check
-        fireLeft = fire.x - fire.width/2
-        fireRight = fire.x + fire.width/2
-        fireTop = fire.y - fire.height/2
-        fireBottom = fire.y + fire.height/2
-        
-        obstacleLeft = obstacle.x
-        obstacleRight = obstacle.x + obstacle.width
-        obstacleTop = obstacle.y
-        obstacleBottom = obstacle.y + obstacle.height
-        
-        # Check for overlap
-        if (fireRight >= obstacleLeft and 
-            fireLeft <= obstacleRight and
-            fireBottom >= obstacleTop and
-            fireTop <= obstacleBottom):
-            return True
-            
-        return False
-
-    def checkLevelCompletion(self):
-        """Check if level is complete and set appropriate flag"""
-        if not self.app.isGameOver and not self.app.isPaused and not self.app.isStartScreen:
-            if self.app.level == 1:
-                # Level 1: Check if all obstacles completed
-                if hasattr(self, 'obstacleManager') and self.obstacleManager.isLevelComplete():
-                    print("Setting level complete flag from game model - Level 1 complete")
-                    self.app.isLevelComplete = True
-            else:
-                # Level 2: Check if all enemies defeated
-                if hasattr(self, 'enemyManager') and self.enemyManager.all_enemies_defeated():
-                    print("Setting level complete flag from game model - Level 2 complete")
-                    self.app.isLevelComplete = True
-
-    def check_enemy_fire_collision_with_player(self, fire, player):
-        """Check if enemy fire collides with player"""
-        # Simple rectangle collision check
-        fireLeft = fire.x - fire.width/2
-        fireRight = fire.x + fire.width/2
-        fireTop = fire.y - fire.height/2
-        fireBottom = fire.y + fire.height/2
-        
-        playerLeft = player.x
-        playerRight = player.x + player.width
-        playerTop = player.y
-        playerBottom = player.y + player.height
-        
-        # Check for overlap
-        if (fireRight >= playerLeft and 
-            fireLeft <= playerRight and
-            fireBottom >= playerTop and
-            fireTop <= playerBottom):
-            return True
-            
-        return False
+    def onLevelComplete(self, event):
+        """The obstacle or enemy manager found the level's goals met.
 
+        The managers publish this only once, so it is never dropped: heard
+        while paused or on a menu, it waits for applyPendingLevelComplete.
+        """
+        if self.app.isGameOver:
+            return
+        if self.app.isPaused or self.app.isStartScreen or self.app.isControlsScreen:
+            log.info("Level %s complete, shown once play resumes", event.level)
+            self.levelCompletePending = True
+            return
+        log.info("Setting level complete flag from game model - Level %s complete", event.level)
+        self.app.isLevelComplete = True
@@ -0,0 +1,68 @@
+"""Drawing and media names used by the models.
+
+Normally this is just cmu_graphics. When DINO_HEADLESS=1 is set before the
+first import, the same names are stand-ins that draw and play nothing, and
+cmu_graphics is never imported, so the game logic runs without a window
+(see Controllers/headless.py).
+
+Calls to the drawing functions are counted in drawCounts, for the
+performance overlay (see Views/perf_overlay.py). The counts only go up;
+take the difference over a frame.
+"""
+import os
+
+HEADLESS = os.environ.get("DINO_HEADLESS") == "1"
+
+DRAW_FUNCTIONS = ("drawImage", "drawRect", "drawLabel", "drawCircle", "drawOval", "drawLine",
+                  "drawPolygon")
+drawCounts = dict.fromkeys(DRAW_FUNCTIONS, 0)
+
+if HEADLESS:
+    def drawImage(*args, **kwargs):
+        pass
+
+    drawRect = drawLabel = drawCircle = drawOval = drawLine = drawPolygon = drawImage
+
+    def rgb(red, green, blue):
+        return (red, green, blue)
+
+    class CMUImage:
+        def __init__(self, image):
+            self.image = image
+
+    class Sound:
+        def __init__(self, url):
+            self.url = url
+
+        def play(self, loop=False, restart=False):
+            pass
+
+        def pause(self):
+            pass
+
+        def setVolume(self, volume):
+            pass
+else:
+    from cmu_graphics import *
+    from cmu_graphics import CMUImage
+    import cmu_graphics
+
+    def countCalls(name):
+        draw = getattr(cmu_graphics, name)
+        def counted(*args, **kwargs):
+            drawCounts[name] += 1
+            return draw(*args, **kwargs)
+        return counted
+
+    drawImage = countCalls("drawImage")
+    drawRect = countCalls("drawRect")
+    drawLabel = countCalls("drawLabel")
+    drawCircle = countCalls("drawCircle")
+    drawOval = countCalls("drawOval")
+    drawLine = countCalls("drawLine")
+    drawPolygon = countCalls("drawPolygon")
+
+    # cmu_graphics colors fail to deep-copy (their attribute lookup raises
+    # KeyError); they never change, so copies of a model (replay keyframes)
+    # just share them
+    type(rgb(0, 0, 0)).__deepcopy__ = lambda self, memo: self
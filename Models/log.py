@@ -0,0 +1,177 @@
+"""Game log: categories, levels, rate limiting and a ring buffer.
+
+    from Models.log import getLogger
+    log = getLogger("enemies")
+    log.debug("Enemy hit! Health: %s/%s", enemy.health, enemy.maxHealth)
+
+Every message belongs to a category (one per part of the game) and has a
+level. Messages at or above their category's level are printed, WARNING
+by default, so the game's running commentary stays off the terminal.
+Messages at or above BUFFER_LEVEL are also kept, unformatted, in a ring
+buffer of the last BUFFER_SIZE, which dump() writes out on demand (the L
+key in the window writes DUMP_FILE, headless runs take --dump-log).
+Anything below both levels returns after a single comparison and is
+never formatted, which is why messages take %s arguments instead of
+being f-strings.
+
+The same message (same category and format string) is printed at most
+RATE_LIMIT times a second; how many were held back is added to the next
+one that gets through.
+
+The DINO_LOG environment variable sets the levels: "debug" for every
+category, or "enemies=debug,obstacles=info" for some of them.
+"""
+from collections import deque
+import os
+import sys
+import threading
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+DEFAULT_LEVEL = WARNING
+BUFFER_LEVEL = INFO
+BUFFER_SIZE = 2000
+RATE_LIMIT = 5  # Prints per second of any one message
+DUMP_FILE = "data/game_log.txt"
+
+class Logger:
+    __slots__ = ("gameLog", "category", "level", "threshold")
+
+    def __init__(self, gameLog, category):
+        self.gameLog = gameLog
+        self.category = category
+        self.level = DEFAULT_LEVEL  # Printed from here up
+        self.threshold = DEFAULT_LEVEL  # Printed or buffered from here up
+
+    def isEnabledFor(self, level):
+        return level >= self.threshold
+
+    def debug(self, message, *args):
+        if DEBUG >= self.threshold:
+            self.gameLog.record(self, DEBUG, message, args)
+
+    def info(self, message, *args):
+        if INFO >= self.threshold:
+            self.gameLog.record(self, INFO, message, args)
+
+    def warning(self, message, *args):
+        if WARNING >= self.threshold:
+            self.gameLog.record(self, WARNING, message, args)
+
+    def error(self, message, *args):
+        if ERROR >= self.threshold:
+            self.gameLog.record(self, ERROR, message, args)
+
+class GameLog:
+    def __init__(self, bufferSize=BUFFER_SIZE, bufferLevel=BUFFER_LEVEL, rateLimit=RATE_LIMIT):
+        self.lock = threading.Lock()
+        self.loggers = {}
+        self.defaultLevel = DEFAULT_LEVEL
+        self.levels = {}  # category -> level, where it differs from defaultLevel
+        self.bufferLevel = bufferLevel
+        self.buffer = deque(maxlen=bufferSize)
+        self.rateLimit = rateLimit
+        self.windows = {}  # (category, message) -> [window start, printed in window, held back]
+        self.startTime = time.monotonic()
+
+    def getLogger(self, category):
+        logger = self.loggers.get(category)
+        if logger is None:
+            logger = Logger(self, category)
+            self.loggers[category] = logger
+            self.updateLogger(logger)
+        return logger
+
+    def setLevel(self, level, category=None):
+        """Print category's messages (or every category's) from level up"""
+        if category is None:
+            self.defaultLevel = level
+            self.levels = {}
+        else:
+            self.levels[category] = level
+        for logger in self.loggers.values():
+            self.updateLogger(logger)
+
+    def updateLogger(self, logger):
+        logger.level = self.levels.get(logger.category, self.defaultLevel)
+        logger.threshold = min(logger.level, self.bufferLevel)
+
+    def configure(self, spec):
+        """Levels from text like "debug" or "enemies=debug,obstacles=info" (see DINO_LOG)"""
+        levels = {name.lower(): level for level, name in LEVEL_NAMES.items()}
+        for part in spec.split(","):
+            category, _, name = part.strip().rpartition("=")
+            if name.lower() not in levels:
+                print(f"Unknown log level {name!r} in {spec!r}", file=sys.stderr)
+                continue
+            self.setLevel(levels[name.lower()], category or None)
+
+    def getState(self):
+        return (self.defaultLevel, dict(self.levels))
+
+    def setState(self, state):
+        self.defaultLevel, self.levels = state[0], dict(state[1])
+        for logger in self.loggers.values():
+            self.updateLogger(logger)
+
+    def record(self, logger, level, message, args):
+        now = time.monotonic()
+        if level >= self.bufferLevel:
+            self.buffer.append((now, level, logger.category, message, args))
+        if level < logger.level:
+            return
+
+        with self.lock:
+            key = (logger.category, message)
+            window = self.windows.get(key)
+            if window is None:
+                window = self.windows[key] = [now, 0, 0]
+            elif now - window[0] >= 1.0:
+                window[0] = now
+                window[1] = 0
+            if window[1] >= self.rateLimit:
+                window[2] += 1
+                return
+            window[1] += 1
+            heldBack = window[2]
+            window[2] = 0
+
+        text = formatMessage(message, args)
+        if heldBack:
+            text += f" ({heldBack} more held back)"
+        print(f"[{LEVEL_NAMES[level]}] {logger.category}: {text}", file=sys.stdout)
+
+    def dump(self, path=None):
+        """Write out the buffered messages, oldest first, to path or stdout"""
+        lines = [f"{when - self.startTime:10.3f} {LEVEL_NAMES[level]:7} {category}: "
+                 f"{formatMessage(message, args)}"
+                 for when, level, category, message, args in list(self.buffer)]
+        if path is None:
+            print("\n".join(lines))
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+def formatMessage(message, args):
+    if not args:
+        return message
+    try:
+        return message % args
+    except (TypeError, ValueError):
+        return f"{message} {args}"
+
+# Shared by the whole process
+gameLog = GameLog()
+if os.environ.get("DINO_LOG"):
+    gameLog.configure(os.environ["DINO_LOG"])
+
+def getLogger(category):
+    return gameLog.getLogger(category)
@@ -1,28 +1,50 @@
 from .cactus import Cactus
 from .bird import Bird
 from .wifi_meteor import WiFiMeteor
+from Models.collision import UniformGrid
+from Models.events import EventBus, LevelComplete, ObstaclePassed
+from Models.pool import getPool
+from Models.rng import getStream
+from Models.log import DEBUG, getLogger
 import Models.database_manager as db
-import random
+
+log = getLogger("obstacles")
+
+OBSTACLE_CLASSES = {"cactus": Cactus, "bird": Bird, "meteor": WiFiMeteor}
+
+def createObstacleManager(app, events=None):
+    """The obstacle backend chosen by app.obstacleBackend: "objects" (default) or "arrays"."""
+    if hasattr(app, 'obstacleBackend') and app.obstacleBackend == "arrays":
+        try:
+            from .obstacle_arrays import ArrayObstacleManager
+        except ImportError as e:
+            log.warning("Array obstacles are not available (%s), using objects", e)
+        else:
+            return ArrayObstacleManager(app, events)
+    return ObstacleManager(app, events)
 
 class ObstacleManager:
-    def __init__(self, app):
+    def __init__(self, app, events=None):
         self.app = app
+        # Passed obstacles and level completion are published here (see Models/events.py)
+        self.events = events if events is not None else EventBus()
         self.width = app.width
         self.height = app.height
         self.groundY = app.height - 30
         self.obstacles = []
         self.spawnTimer = 0
         
+        # Broad phase for fires hitting obstacles (see Models/collision.py)
+        self.grid = UniformGrid()
+        self.rng = getStream(app, "spawns")
+        self.cosmeticRng = getStream(app, "cosmetics")
+        
         self.currentLevel = app.level
-        settings = db.get_level_settings(self.currentLevel)
-        self.spawnInterval = settings["spawnInterval"]
+        self.applyConfig(db.get_level_settings(self.currentLevel))
         
         self.birdsPassed = 0
         self.cactiPassed = 0
         self.meteorsPassed = 0
-        self.maxBirds = settings["birdCount"]
-        self.maxCacti = settings["cactusCount"]
-        self.maxMeteors = settings["meteorCount"]
         
         self.birdsSpawned = 0
         self.cactiSpawned = 0
@@ -33,63 +55,35 @@ class ObstacleManager:
         self.completionDelayTimer = 0
         self.completionDelayFrames = 300  # Wait 100 frames before showing completion screen
     
-    def update(self):
-        # Don't update if level is complete
-        if hasattr(self.app, 'isLevelComplete') and self.app.isLevelComplete:
-            return
-        
-        settings = db.get_level_settings(self.currentLevel)
-        
+    def updateObstacles(self):
+        """Move every obstacle; part of the physics stage"""
+        for obstacle in self.obstacles:
+            obstacle.update()
+    
+    def updateSpawning(self):
+        """Retire passed obstacles, detect the end of the level and spawn new ones"""
         # If level completion has been detected but screen not shown yet, increment timer
         if self.levelCompleteDetected and not self.app.isLevelComplete:
             self.completionDelayTimer += 1
             if self.completionDelayTimer >= self.completionDelayFrames:
-                print(f"Completion delay reached after {self.completionDelayTimer} frames. Showing level complete screen!")
+                log.info("Completion delay reached after %d frames. Showing level complete screen!",
+                         self.completionDelayTimer)
                 self.app.isLevelComplete = True
                 return
         
-        for obstacle in self.obstacles:
-            obstacle.update()
-        
-        # Count destroyed obstacles
-        for obstacle in self.obstacles:
-            if obstacle.isDead and not obstacle.counted:
-                if obstacle.type == "bird":
-                    self.birdsPassed += 1
-                elif obstacle.type == "cactus":
-                    self.cactiPassed += 1
-                elif obstacle.type == "meteor":
-                    self.meteorsPassed += 1
-                obstacle.counted = True
-                print(f"Obstacle {obstacle.type} passed! Total passed: {self.birdsPassed + self.cactiPassed + self.meteorsPassed}")
-                
-        # Remove dead obstacles from list
-        self.obstacles = [obs for obs in self.obstacles if not obs.isDead]
+        # The level can only be over once the counts change
+        if self.retireObstacles():
+            self.checkCompletion()
         
         # Print obstacle status every 50 frames for debugging
-        if self.app.timer % 50 == 0:
-            print(f"OBSTACLE STATUS: Spawned: Birds={self.birdsSpawned}/{self.maxBirds}, Cacti={self.cactiSpawned}/{self.maxCacti}, Meteors={self.meteorsSpawned}/{self.maxMeteors}")
-            print(f"OBSTACLE STATUS: Passed: Birds={self.birdsPassed}/{self.maxBirds}, Cacti={self.cactiPassed}/{self.maxCacti}, Meteors={self.meteorsPassed}/{self.maxMeteors}")
-            print(f"Active obstacles: {len(self.obstacles)}")
-            
-            # Force check level completion
-            isComplete = self.isLevelComplete()
-            print(f"Level completion check result: {isComplete}")
-        
-        # Only check level completion if all obstacles have been spawned
-        allSpawned = (self.birdsSpawned >= self.maxBirds and 
-                      self.cactiSpawned >= self.maxCacti and 
-                      self.meteorsSpawned >= self.maxMeteors)
-                      
-        if allSpawned:
-            # Check if all obstacles are gone and level is complete
-            isComplete = self.isLevelComplete()
-            
-            # If level complete and not already detected, start the delay timer
-            if isComplete and not self.levelCompleteDetected and not self.app.isGameOver:
-                print("LEVEL COMPLETE DETECTED! Starting delay timer...")
-                self.levelCompleteDetected = True
-                self.completionDelayTimer = 0
+        if self.app.timer % 50 == 0 and log.isEnabledFor(DEBUG):
+            log.debug("OBSTACLE STATUS: Spawned: Birds=%d/%d, Cacti=%d/%d, Meteors=%d/%d",
+                      self.birdsSpawned, self.maxBirds, self.cactiSpawned, self.maxCacti,
+                      self.meteorsSpawned, self.maxMeteors)
+            log.debug("OBSTACLE STATUS: Passed: Birds=%d/%d, Cacti=%d/%d, Meteors=%d/%d",
+                      self.birdsPassed, self.maxBirds, self.cactiPassed, self.maxCacti,
+                      self.meteorsPassed, self.maxMeteors)
+            log.debug("Active obstacles: %d", len(self.obstacles))
         
         # Spawn new obstacles if not all have been spawned yet
         self.spawnTimer += 1
@@ -98,31 +92,85 @@ class ObstacleManager:
                 self.cactiSpawned < self.maxCacti or 
                 self.meteorsSpawned < self.maxMeteors):
                 self.spawnObstacle()
+                self.checkCompletion()
             self.spawnTimer = 0
+    
+    def checkCompletion(self):
+        """Publish LevelComplete the first time the level's goals are met"""
+        if not self.levelCompleteDetected and not self.app.isGameOver and self.isLevelComplete():
+            log.info("LEVEL COMPLETE DETECTED! Starting delay timer...")
+            self.levelCompleteDetected = True
+            self.completionDelayTimer = 0
+            self.events.publish(LevelComplete(self.currentLevel))
+            
+    def retireObstacles(self):
+        """Count the obstacles that went off screen and remove every dead one.
+
+        Returns whether any were removed.
+        """
+        for obstacle in self.obstacles:
+            if obstacle.isDead and not obstacle.counted:
+                if obstacle.type == "bird":
+                    self.birdsPassed += 1
+                elif obstacle.type == "cactus":
+                    self.cactiPassed += 1
+                elif obstacle.type == "meteor":
+                    self.meteorsPassed += 1
+                obstacle.counted = True
+                log.debug("Obstacle %s passed! Total passed: %d", obstacle.type,
+                          self.birdsPassed + self.cactiPassed + self.meteorsPassed)
+                self.events.publish(ObstaclePassed(obstacle.type))
+                
+        # Remove dead obstacles from list, keeping them for later spawns
+        obstacles = []
+        for obstacle in self.obstacles:
+            if obstacle.isDead:
+                self.getPool(obstacle.type).release(obstacle)
+            else:
+                obstacles.append(obstacle)
+        removed = len(obstacles) < len(self.obstacles)
+        self.obstacles = obstacles
+        return removed
+    
+    def releaseObstacles(self):
+        """Hand every obstacle back to the pools, when the game is thrown away"""
+        for obstacle in self.obstacles:
+            self.getPool(obstacle.type).release(obstacle)
+        self.obstacles = []
+    
+    def getPool(self, obstacleType):
+        """Spare obstacles of one type (see Models/pool.py)"""
+        return getPool(self.app, obstacleType, OBSTACLE_CLASSES[obstacleType])
+    
+    def savePositions(self):
+        for obstacle in self.obstacles:
+            obstacle.savePosition()
             
     def updateLevel(self, level):
         """Update obstacle counts when level changes"""
         self.currentLevel = level
         
         # Get new obstacle counts from config
-        settings = db.get_level_settings(level)
-        
-        # Update maximums
-        self.maxBirds = settings["birdCount"]
-        self.maxCacti = settings["cactusCount"]
-        self.maxMeteors = settings["meteorCount"]
+        self.applyConfig(db.get_level_settings(level))
         
         # Reset spawn counters for new level
         self.birdsSpawned = min(self.birdsSpawned, self.maxBirds)
         self.cactiSpawned = min(self.cactiSpawned, self.maxCacti)
         self.meteorsSpawned = min(self.meteorsSpawned, self.maxMeteors)
+    
+    def applyConfig(self, config):
+        """Use new level settings; obstacles already on screen keep going"""
+        self.config = config
+        
+        # Update maximums
+        self.maxBirds = config.birdCount
+        self.maxCacti = config.cactusCount
+        self.maxMeteors = config.meteorCount
         
         # Update level settings
-        self.spawnInterval = settings["spawnInterval"]
+        self.spawnInterval = config.spawnInterval
     
     def spawnObstacle(self):
-        settings = db.get_level_settings(self.currentLevel)
-        
         if (self.birdsSpawned >= self.maxBirds and 
             self.cactiSpawned >= self.maxCacti and 
             self.meteorsSpawned >= self.maxMeteors):
@@ -132,8 +180,8 @@ class ObstacleManager:
         canSpawnCactus = self.cactiSpawned < self.maxCacti
         canSpawnMeteor = self.meteorsSpawned < self.maxMeteors
         
-        birdProb = settings["birdProbability"]
-        meteorProb = settings["meteorProbability"]
+        birdProb = self.config.birdProbability
+        meteorProb = self.config.meteorProbability
         
         availableTypes = []
         if canSpawnBird:
@@ -146,7 +194,7 @@ class ObstacleManager:
         if not availableTypes:
             return
             
-        randomVal = random.random()
+        randomVal = self.rng.random()
         if len(availableTypes) == 1:
             obstacleType = availableTypes[0]
         elif len(availableTypes) == 2:
@@ -171,49 +219,52 @@ class ObstacleManager:
             
             y = self.app.groundY - height
             
-            speed = settings["baseSpeed"]["cactus"]
-            
-            obstacle = Cactus(
-                x=x,
-                y=y,
-                width=width,
-                height=height,
-                speed=speed
-            )
-            
-            obstacle.counted = False
+            speed = self.config.cactusSpeed
             self.cactiSpawned += 1
             
         elif obstacleType == "bird":
             width = 60
             height = 50
+            x = self.app.width + 20
             
             y_options = [self.app.groundY - 120, self.app.groundY - 80, self.app.groundY - 40]
-            y = random.choice(y_options)
-            
-            speed = settings["baseSpeed"]["bird"]
-            
-            obstacle = Bird(
-                x=self.app.width + 20, 
-                y=y,
-                width=width,
-                height=height,
-                speed=speed
-            )
+            y = self.rng.choice(y_options)
             
-            obstacle.counted = False
+            speed = self.config.birdSpeed
             self.birdsSpawned += 1
             
         elif obstacleType == "meteor":
             width = 45
             height = 70
             
-            x = self.app.width * (0.3 + 0.7 * random.random())
+            x = self.app.width * (0.3 + 0.7 * self.rng.random())
             y = 0
             
-            speed = settings["baseSpeed"]["bird"] * 1.2
-            
-            obstacle = WiFiMeteor(
+            speed = self.config.birdSpeed * 1.2
+            self.meteorsSpawned += 1
+
+        self.addObstacle(obstacleType, x, y, width, height, speed)
+    
+    def addObstacle(self, obstacleType, x, y, width, height, speed):
+        if obstacleType == "cactus":
+            obstacle = self.getPool("cactus").acquire(
+                x=x,
+                y=y,
+                width=width,
+                height=height,
+                speed=speed,
+                rng=self.cosmeticRng
+            )
+        elif obstacleType == "bird":
+            obstacle = self.getPool("bird").acquire(
+                x=x, 
+                y=y,
+                width=width,
+                height=height,
+                speed=speed
+            )
+        else:
+            obstacle = self.getPool("meteor").acquire(
                 x=x,
                 y=y,
                 app=self.app,
@@ -221,10 +272,8 @@ class ObstacleManager:
                 height=height,
                 speed=speed
             )
-            
-            obstacle.counted = False
-            self.meteorsSpawned += 1
 
+        obstacle.counted = False
         self.obstacles.append(obstacle)
     
     def getObstacleCountsText(self):
@@ -253,10 +302,13 @@ class ObstacleManager:
         noObstaclesLeft = len(self.obstacles) == 0
         
         # For debugging - print in console
-        if allSpawned and (sufficientObstaclesPassed or noObstaclesLeft):
-            print(f"Level completion check: allSpawned={allSpawned}, sufficientObstaclesPassed={sufficientObstaclesPassed}, noObstaclesLeft={noObstaclesLeft}")
-            print(f"Birds: {self.birdsPassed}/{self.maxBirds}, Cacti: {self.cactiPassed}/{self.maxCacti}, Meteors: {self.meteorsPassed}/{self.maxMeteors}")
-            print(f"Total passed: {totalObstaclesPassed}/{totalObstaclesToSpawn} ({(totalObstaclesPassed/totalObstaclesToSpawn)*100:.1f}%)")
+        if allSpawned and (sufficientObstaclesPassed or noObstaclesLeft) and log.isEnabledFor(DEBUG):
+            log.debug("Level completion check: allSpawned=%s, sufficientObstaclesPassed=%s, noObstaclesLeft=%s",
+                      allSpawned, sufficientObstaclesPassed, noObstaclesLeft)
+            log.debug("Birds: %d/%d, Cacti: %d/%d, Meteors: %d/%d", self.birdsPassed, self.maxBirds,
+                      self.cactiPassed, self.maxCacti, self.meteorsPassed, self.maxMeteors)
+            log.debug("Total passed: %d/%d (%.1f%%)", totalObstaclesPassed, totalObstaclesToSpawn,
+                      totalObstaclesPassed / totalObstaclesToSpawn * 100)
         
         # Return true if all obstacles have been spawned and either:
         # 1) Enough obstacles have been passed, or
@@ -1,30 +1,27 @@
-from cmu_graphics import *
+from Models.graphics import *
 from .obstacle import Obstacle
-from PIL import Image
-import os
+from Models.sprite_cache import sprites
 
 class Bird(Obstacle):
+    __slots__ = ("animationTimer", "frame_index", "flying_frames")
+    
+    type = "bird"
+    
     def __init__(self, x, y, width, height, speed=6):
         super().__init__(x, y, width, height, speed, color="blue")
-        self.type = "bird"
-        self.color = "blue"
+        self.animationTimer = 0
+        self.frame_index = 0
+        self.loadFrames()
+    
+    def reset(self, x, y, width, height, speed=6):
+        super().reset(x, y, width, height, speed)
         self.animationTimer = 0
         self.frame_index = 0
         self.loadFrames()
         
     def loadFrames(self):
         """Load all animation frames from the bird folder"""
-        flying_dir = 'assets/bird/flying'
-        self.flying_frames = []
-        
-        if os.path.exists(flying_dir):
-            files = [f for f in os.listdir(flying_dir) if f.endswith('.gif')]
-            files.sort(key=lambda x: int(x.split('.')[0]))
-            
-            for file in files:
-                file_path = os.path.join(flying_dir, file)
-                image = Image.open(file_path)
-                self.flying_frames.append(CMUImage(image))
+        self.flying_frames = sprites.getFrames('assets/bird/flying', size=(self.width, self.height))
                 
     def update(self):
         super().update()
@@ -37,9 +34,8 @@ class Bird(Obstacle):
     def draw(self):
         if len(self.flying_frames) > 0:
             frameIndex = self.frame_index % len(self.flying_frames)
-            drawImage(self.flying_frames[frameIndex], self.x, self.y, 
-                     width=self.width, height=self.height)
+            drawImage(self.flying_frames[frameIndex], self.drawX, self.drawY)
         else:
-            drawRect(self.x, self.y, self.width, self.height, fill=self.color)
-            drawLabel("Bird", self.x + self.width/2, self.y - 10, 
+            drawRect(self.drawX, self.drawY, self.width, self.height, fill=self.color)
+            drawLabel("Bird", self.drawX + self.width/2, self.drawY - 10, 
                      fill='white', bold=True, size=12)
\ No newline at end of file
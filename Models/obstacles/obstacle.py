@@ -1,16 +1,27 @@
 from Models.base_model import GameObject
-from cmu_graphics import *
+from Models.graphics import *
 
 class Obstacle(GameObject):
+    __slots__ = ("speed", "isDead", "color", "counted")
+    
+    type = "obstacle"
+    
     def __init__(self, x, y, width, height, speed=5, color="green"):
         super().__init__(x, y, width, height)
         self.speed = speed
         self.isDead = False
         self.color = color
-        self.type = "obstacle"
+        self.counted = False
+
+    def reset(self, x, y, width, height, speed=5):
+        """Start over as a new obstacle (obstacles are pooled, see Models/pool.py)"""
+        self.place(x, y, width, height)
+        self.speed = speed
+        self.isDead = False
         self.counted = False
 
     def update(self):
+        self.tickCount += 1
         self.x -= self.speed
         
         # Mark as dead when off-screen
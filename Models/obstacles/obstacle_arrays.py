@@ -0,0 +1,293 @@
+"""Struct-of-arrays obstacle backend.
+
+ArrayObstacleManager has the same API as ObstacleManager, but every obstacle
+is a row in a set of NumPy arrays (position, size, speed, type, dead and
+counted flags, age) instead of a Cactus/Bird/WiFiMeteor object. Moving
+obstacles and meteors, noticing they left the screen and counting the ones
+that passed are each one array operation per tick however many obstacles
+are alive, so thousands of them fit in a tick.
+
+Collisions, drawing and getEntities() still see objects: .obstacles holds
+an ObstacleRow handle per row, which reads and writes its row. A handle
+stays the same object for as long as its obstacle lives.
+
+    python main.py --headless --obstacles arrays
+
+Needs numpy; without it createObstacleManager() falls back to objects.
+"""
+from Models.base_model import GameObject
+from Models.events import ObstaclePassed
+from Models.graphics import *
+from Models.sprite_cache import sprites
+from . import ObstacleManager
+from Models.log import getLogger
+import math
+import numpy as np
+
+log = getLogger("obstacles")
+
+OBSTACLE_TYPES = ("cactus", "bird", "meteor")
+CACTUS, BIRD, METEOR = 0, 1, 2
+
+# Animation frame advances every this many ticks, per type (cacti do not animate)
+ANIMATION_TICKS = (0, 2, 3)
+METEOR_ROTATION = 10
+
+# Dead when further left than this
+OFFSCREEN_X = -50
+
+# Arrays start this big and double when full
+INITIAL_CAPACITY = 64
+
+ROW_FIELDS = {
+    "xs": np.float64,
+    "ys": np.float64,
+    "prevXs": np.float64,
+    "prevYs": np.float64,
+    "xSpeeds": np.float64,
+    "ySpeeds": np.float64,
+    "widths": np.float64,
+    "heights": np.float64,
+    "kinds": np.int8,
+    "images": np.int16,  # Cactus image index, -1 if there are no images
+    "ages": np.int64,  # Ticks advanced, drives the animation
+    "deadFlags": np.bool_,
+    "countedFlags": np.bool_,
+}
+
+class ObstacleRow:
+    """Handle to one obstacle of an ArrayObstacleManager"""
+    __slots__ = ("manager", "index")
+
+    # Rows are made new for every obstacle, never reused
+    generation = 0
+
+    def __init__(self, manager, index):
+        self.manager = manager
+        self.index = index
+
+    @property
+    def type(self):
+        return OBSTACLE_TYPES[self.manager.kinds[self.index]]
+
+    @property
+    def x(self):
+        return float(self.manager.xs[self.index])
+
+    @property
+    def y(self):
+        return float(self.manager.ys[self.index])
+
+    @property
+    def width(self):
+        return float(self.manager.widths[self.index])
+
+    @property
+    def height(self):
+        return float(self.manager.heights[self.index])
+
+    @property
+    def prevX(self):
+        return float(self.manager.prevXs[self.index])
+
+    @property
+    def prevY(self):
+        return float(self.manager.prevYs[self.index])
+
+    @property
+    def drawX(self):
+        return self.prevX + (self.x - self.prevX) * GameObject.renderAlpha
+
+    @property
+    def drawY(self):
+        return self.prevY + (self.y - self.prevY) * GameObject.renderAlpha
+
+    @property
+    def tickCount(self):
+        return int(self.manager.ages[self.index])
+
+    @property
+    def isDead(self):
+        return bool(self.manager.deadFlags[self.index])
+
+    @isDead.setter
+    def isDead(self, value):
+        self.manager.deadFlags[self.index] = value
+
+    @property
+    def counted(self):
+        return bool(self.manager.countedFlags[self.index])
+
+    @counted.setter
+    def counted(self, value):
+        self.manager.countedFlags[self.index] = value
+
+    def getBox(self):
+        return self.boxAt(self.x, self.y)
+
+    def getPreviousBox(self):
+        return self.boxAt(self.prevX, self.prevY)
+
+    def boxAt(self, x, y):
+        return (x, y, x + self.width, y + self.height)
+
+    def savePosition(self):
+        self.manager.prevXs[self.index] = self.manager.xs[self.index]
+        self.manager.prevYs[self.index] = self.manager.ys[self.index]
+
+    def draw(self):
+        self.manager.drawRow(self.index)
+
+class ArrayObstacleManager(ObstacleManager):
+    def __init__(self, app, events=None):
+        super().__init__(app, events)
+        self.count = 0
+        self.capacity = INITIAL_CAPACITY
+        for name, dtype in ROW_FIELDS.items():
+            setattr(self, name, np.zeros(self.capacity, dtype))
+
+        # Sprites per type, loaded when the first one spawns
+        self.frames = {}
+
+    def getFrames(self, kind):
+        if kind not in self.frames:
+            if kind == CACTUS:
+                self.frames[kind] = sprites.getFrames('assets/cactus', extensions=('.png', '.gif'),
+                                                      size=(60, 60))
+            elif kind == BIRD:
+                self.frames[kind] = sprites.getFrames('assets/bird/flying', size=(60, 50))
+            else:
+                self.frames[kind] = sprites.getFrames('assets/wifi_meteor', size=(45, 70))
+        return self.frames[kind]
+
+    def grow(self):
+        self.capacity *= 2
+        for name in ROW_FIELDS:
+            array = getattr(self, name)
+            grown = np.zeros(self.capacity, array.dtype)
+            grown[:self.count] = array[:self.count]
+            setattr(self, name, grown)
+
+    def addObstacle(self, obstacleType, x, y, width, height, speed):
+        if self.count == self.capacity:
+            self.grow()
+        i = self.count
+        kind = OBSTACLE_TYPES.index(obstacleType)
+
+        xSpeed = speed
+        ySpeed = 0
+        image = -1
+        if kind == CACTUS:
+            images = self.getFrames(CACTUS)
+            # Same draw from the cosmetic stream as Cactus makes
+            if len(images) > 0:
+                image = self.cosmeticRng.randrange(len(images))
+        elif kind == METEOR:
+            self.getFrames(METEOR)
+            # Straight at the ground near the dino, like WiFiMeteor
+            dx = 100 - x
+            dy = self.app.groundY - y
+            distance = math.sqrt(dx**2 + dy**2)
+            xSpeed = abs(dx / distance * speed * 1.3)
+            ySpeed = abs(dy / distance * speed * 2.3)
+            self.app.meteorSound.play(loop=False)
+        else:
+            self.getFrames(BIRD)
+
+        self.xs[i] = self.prevXs[i] = x
+        self.ys[i] = self.prevYs[i] = y
+        self.xSpeeds[i] = xSpeed
+        self.ySpeeds[i] = ySpeed
+        self.widths[i] = width
+        self.heights[i] = height
+        self.kinds[i] = kind
+        self.images[i] = image
+        self.ages[i] = 0
+        self.deadFlags[i] = False
+        self.countedFlags[i] = False
+        self.count += 1
+        self.obstacles.append(ObstacleRow(self, i))
+
+    def updateObstacles(self):
+        """Move every obstacle; part of the physics stage"""
+        n = self.count
+        x = self.xs[:n]
+        y = self.ys[:n]
+        x -= self.xSpeeds[:n]
+        y += self.ySpeeds[:n]
+        self.ages[:n] += 1
+        self.deadFlags[:n] |= (x < OFFSCREEN_X) | ((self.kinds[:n] == METEOR) & (y > self.groundY))
+
+    def retireObstacles(self):
+        """Count the obstacles that went off screen and remove every dead one.
+
+        Returns whether any were removed.
+        """
+        n = self.count
+        dead = self.deadFlags[:n]
+        if not dead.any():
+            return False
+
+        passed = dead & ~self.countedFlags[:n]
+        if passed.any():
+            byType = np.bincount(self.kinds[:n][passed], minlength=len(OBSTACLE_TYPES))
+            self.cactiPassed += int(byType[CACTUS])
+            self.birdsPassed += int(byType[BIRD])
+            self.meteorsPassed += int(byType[METEOR])
+            self.countedFlags[:n] |= passed
+            log.debug("%d obstacles passed! Total passed: %d", int(byType.sum()),
+                      self.birdsPassed + self.cactiPassed + self.meteorsPassed)
+            for kind in self.kinds[:n][passed].tolist():
+                self.events.publish(ObstaclePassed(OBSTACLE_TYPES[kind]))
+
+        # Move the live rows to the front, in order, and renumber their handles
+        keep = ~dead
+        alive = int(keep.sum())
+        first = int(np.argmax(dead))
+        for name in ROW_FIELDS:
+            array = getattr(self, name)
+            array[:alive] = array[:n][keep]
+        self.obstacles = self.obstacles[:first] + [row for row, isAlive in
+                                                   zip(self.obstacles[first:], keep[first:].tolist())
+                                                   if isAlive]
+        for i in range(first, alive):
+            self.obstacles[i].index = i
+        self.count = alive
+        return True
+
+    def releaseObstacles(self):
+        """Rows are reused in place, there are no obstacle objects to pool"""
+        self.obstacles = []
+        self.count = 0
+
+    def savePositions(self):
+        self.prevXs[:self.count] = self.xs[:self.count]
+        self.prevYs[:self.count] = self.ys[:self.count]
+
+    def drawRow(self, i):
+        kind = self.kinds[i]
+        frames = self.getFrames(kind)
+        alpha = GameObject.renderAlpha
+        x = self.prevXs[i] + (self.xs[i] - self.prevXs[i]) * alpha
+        y = self.prevYs[i] + (self.ys[i] - self.prevYs[i]) * alpha
+
+        if kind == CACTUS:
+            image = frames[self.images[i]] if self.images[i] >= 0 else None
+            if image:
+                drawImage(image, x, y)
+            else:
+                drawRect(x, y, self.widths[i], self.heights[i], fill="darkgreen")
+                drawLabel("Cactus", x + self.widths[i]/2, y - 10, fill='white', bold=True, size=12)
+        elif kind == BIRD:
+            if len(frames) > 0:
+                drawImage(frames[self.ages[i] // ANIMATION_TICKS[BIRD] % len(frames)], x, y)
+            else:
+                drawRect(x, y, self.widths[i], self.heights[i], fill="blue")
+                drawLabel("Bird", x + self.widths[i]/2, y - 10, fill='white', bold=True, size=12)
+        elif len(frames) > 0:
+            drawImage(frames[self.ages[i] // ANIMATION_TICKS[METEOR] % len(frames)], x, y,
+                      rotateAngle=METEOR_ROTATION)
+
+    def draw(self):
+        for i in range(self.count):
+            self.drawRow(i)
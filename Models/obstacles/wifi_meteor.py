@@ -1,15 +1,21 @@
-from cmu_graphics import *
+from Models.graphics import *
 from .obstacle import Obstacle
-from PIL import Image
-import os
+from Models.sprite_cache import sprites
 import math
 
 class WiFiMeteor(Obstacle):
+    __slots__ = ("app", "animationTimer", "frame_index", "meteor_frames", "targetX", "targetY",
+                 "xSpeed", "ySpeed", "rotation")
+    
+    type = "meteor"
+    
     def __init__(self, x, y, app, width=70, height=70, speed=7):
         super().__init__(x, y, width, height, speed, color="purple")
+        self.reset(x, y, app, width, height, speed)
+    
+    def reset(self, x, y, app, width=70, height=70, speed=7):
+        super().reset(x, y, width, height, speed)
         self.app = app
-        self.type = "meteor"
-        self.color = "purple"
         self.animationTimer = 0
         self.frame_index = 0
         self.loadFrames()
@@ -35,19 +41,11 @@ class WiFiMeteor(Obstacle):
         
     def loadFrames(self):
         """Load all animation frames from the wifi_meteor folder"""
-        meteor_dir = 'assets/wifi_meteor'
-        self.meteor_frames = []
-        
-        if os.path.exists(meteor_dir):
-            files = [f for f in os.listdir(meteor_dir) if f.endswith('.gif')]
-
-            files.sort(key=lambda x: int(x.split('.')[0]))
-            for file in files:
-                file_path = os.path.join(meteor_dir, file)
-                image = Image.open(file_path)
-                self.meteor_frames.append(CMUImage(image))
+        self.meteor_frames = sprites.getFrames('assets/wifi_meteor', size=(self.width, self.height))
     
     def update(self):
+        self.tickCount += 1
+        
         # Update position
         self.x -= self.xSpeed
         self.y += self.ySpeed
@@ -65,6 +63,5 @@ class WiFiMeteor(Obstacle):
         if len(self.meteor_frames) > 0:
             # Use current frame for meteor animation
             frameIndex = self.frame_index % len(self.meteor_frames)
-            drawImage(self.meteor_frames[frameIndex], self.x, self.y, 
-                     width=self.width, height=self.height,
+            drawImage(self.meteor_frames[frameIndex], self.drawX, self.drawY, 
                      rotateAngle=self.rotation)
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""Object pools, so spawning and firing reuse finished objects.
+
+A pool keeps up to capacity spare objects of one kind. acquire() takes one
+and calls its reset() with the arguments the constructor would get, which
+must leave it exactly as a newly constructed object (runs replay tick for
+tick whether objects come from the pool or not); with no spare it builds a
+new one. release() hands back an object the game is done with; once the
+pool is full, further ones are left to the garbage collector.
+
+Pools live on the app like the random streams (see Models/rng.py), so they
+outlast a single run and a restarted game starts warm.
+"""
+
+# Spare objects kept per pool; about what is on screen at once
+POOL_CAPACITIES = {
+    "fires": 32,
+    "cactus": 8,
+    "bird": 8,
+    "meteor": 8,
+    "enemies": 4
+}
+
+class ObjectPool:
+    def __init__(self, name, create, capacity=16):
+        self.name = name
+        self.create = create
+        self.capacity = capacity
+        self.free = []
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    def acquire(self, *args, **kwargs):
+        """A spare object reset with these arguments, or a new one made with them"""
+        if self.free:
+            self.hits += 1
+            obj = self.free.pop()
+            obj.reset(*args, **kwargs)
+            return obj
+        self.misses += 1
+        return self.create(*args, **kwargs)
+
+    def release(self, obj):
+        """Take back an object nothing uses any more"""
+        if len(self.free) < self.capacity:
+            self.free.append(obj)
+        else:
+            self.dropped += 1
+
+    def releaseAll(self, objects):
+        for obj in objects:
+            self.release(obj)
+
+    def getStats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "dropped": self.dropped,
+            "free": len(self.free),
+            "capacity": self.capacity
+        }
+
+def getPool(app, name, create):
+    """The app's pool called name, made on first use; create builds a new object"""
+    if not hasattr(app, 'pools'):
+        app.pools = {}
+    pool = app.pools.get(name)
+    if pool is None:
+        pool = ObjectPool(name, create, POOL_CAPACITIES.get(name, 16))
+        app.pools[name] = pool
+    return pool
+
+def getPoolStats(app):
+    """getStats() of every pool the app has, by name"""
+    if not hasattr(app, 'pools'):
+        return {}
+    return {name: pool.getStats() for name, pool in app.pools.items()}
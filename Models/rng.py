@@ -0,0 +1,60 @@
+"""Seeded random numbers, one independent stream per subsystem.
+
+All gameplay randomness goes through app.rng instead of the global random
+module. Each stream is seeded from the run seed and its own name, so the
+same seed and inputs give the same game tick for tick, and drawing extra
+numbers in one subsystem (say, a new cosmetic effect) does not shift what
+another one sees. Every run (level start) gets its own seed, drawn from the
+seed the service was created with, so a single run can be replayed alone.
+"""
+import hashlib
+import random
+
+# spawns: obstacle types and positions, ai: enemy decisions,
+# cosmetics: things that do not affect gameplay (clouds, cactus looks)
+RNG_STREAMS = ("spawns", "ai", "cosmetics")
+
+class RngService:
+    def __init__(self, seed=None):
+        self.streams = {name: random.Random() for name in RNG_STREAMS}
+        self.reseed(seed)
+        self.baseSeed = self.seed
+        self.runSeeds = random.Random(self.seed)
+
+    def startRun(self, seed=None):
+        """Reseed for a new run, with seed or the next run seed; returns the seed used"""
+        if seed is None:
+            seed = self.runSeeds.randrange(2 ** 32)
+        self.reseed(seed)
+        return seed
+
+    def reseed(self, seed=None):
+        """Restart every stream from seed, or from a fresh random seed if None.
+
+        The stream objects are kept, so models holding one see the new sequence.
+        """
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        self.seed = seed
+        for name, stream in self.streams.items():
+            stream.seed(self.streamSeed(name))
+
+    def streamSeed(self, name):
+        digest = hashlib.sha256(f"{self.seed}:{name}".encode()).digest()
+        return int.from_bytes(digest[:8], "big")
+
+    def stream(self, name):
+        return self.streams[name]
+
+    def getState(self):
+        return {name: stream.getstate() for name, stream in self.streams.items()}
+
+    def setState(self, state):
+        for name, streamState in state.items():
+            self.streams[name].setstate(streamState)
+
+def getStream(app, name):
+    """The app's named stream; apps without an RngService use the global random module"""
+    if hasattr(app, 'rng'):
+        return app.rng.stream(name)
+    return random
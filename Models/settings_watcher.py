@@ -0,0 +1,86 @@
+from Models.log import getLogger
+import Models.database_manager as db
+import csv
+import threading
+
+log = getLogger("settings")
+
+class SettingsWatcher:
+    """Hot-reloads the settings CSVs while the game is running.
+
+    A background thread polls the files' mtime and size. A change is only
+    parsed once the file has stopped changing between two polls, so a
+    half-written save is never read, and a file that fails validation
+    keeps the previous settings (at startup, the defaults). Parsed
+    configs wait in pending until the UI thread calls applyPending() at
+    the start of a tick, which swaps them into the model in one go.
+    """
+    def __init__(self, paths=None, interval=0.5):
+        self.paths = paths or [db.LEVEL_1_FILE, db.LEVEL_2_FILE, db.BATTLE_FILE]
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.versions = {}
+        self.candidates = {}
+        self.pending = {}
+        self.stopEvent = threading.Event()
+        self.thread = None
+
+    def start(self):
+        # Load every file once up front; afterwards reads come from the cache
+        for path in self.paths:
+            version = db.get_file_version(path)
+            db.set_cached_settings(path, version, db.load_settings_file(path))
+            db.watch_settings_file(path)
+            self.versions[path] = version
+
+        self.thread = threading.Thread(target=self.run, name="settings-watcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopEvent.set()
+
+    def run(self):
+        while not self.stopEvent.wait(self.interval):
+            for path in self.paths:
+                self.poll(path)
+
+    def poll(self, path):
+        version = db.get_file_version(path)
+        if version is None or version == self.versions[path]:
+            self.candidates.pop(path, None)
+            return
+
+        # Wait until the file stops changing before reading it
+        if self.candidates.get(path) != version:
+            self.candidates[path] = version
+            return
+        del self.candidates[path]
+
+        try:
+            config = db.parse_settings_file(path)
+        except (db.SettingsError, OSError, csv.Error) as e:
+            log.warning("Keeping previous settings: %s", e)
+            self.versions[path] = version
+            return
+
+        # Changed again while we were reading it, pick it up on a later poll
+        if db.get_file_version(path) != version:
+            return
+
+        self.versions[path] = version
+        log.info("Reloaded %s", path)
+        with self.lock:
+            self.pending[path] = (version, config)
+
+    def applyPending(self, model):
+        """Swap freshly loaded settings into the model; call at a tick boundary"""
+        if not self.pending:
+            return
+
+        with self.lock:
+            pending = self.pending
+            self.pending = {}
+
+        for path, (version, config) in pending.items():
+            db.set_cached_settings(path, version, config)
+            model.applySettings(path, config)
@@ -0,0 +1,217 @@
+from Models.graphics import CMUImage, HEADLESS
+from Models.atlas import Atlas, listFrameFiles, scaleImage, sizeKey
+from Models.frame_cache import FrameDiskCache
+from PIL import Image
+from Models.log import getLogger
+import atexit
+import os
+import threading
+
+log = getLogger("assets")
+
+class SpriteCache:
+    """Process-wide cache of decoded animation frames.
+
+    Every animation is decoded once per (directory, orientation, size) and
+    the same immutable tuple of CMUImages is handed to every entity that
+    asks for it, so spawning an obstacle or a fireball does no disk I/O.
+    Passing the size an entity draws at returns frames already resampled
+    to it, so drawImage can blit them without scaling. Animations found in
+    a built atlas are cut out of the atlas sheet instead of being opened
+    file by file; everything else is decoded once and kept in the on-disk
+    frame cache for the next launch.
+
+    Decoding is thread-safe and can be started ahead of time with
+    prefetchFrames(); wrapping into CMUImages always happens on the UI thread.
+    In headless mode nothing is decoded: animations are placeholders with
+    the right number of frames, which is all the game logic looks at.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.diskCache = None
+        self.atlas = None
+        self.atlasChecked = False
+        self.inflight = {}
+        self.frames = {}
+        self.frameBytes = {}
+        self.hits = 0
+        self.misses = 0
+        self.bytesSaved = 0
+
+    def getFrames(self, directory, flipped=False, extensions=('.gif',), size=None):
+        """Return the frames found in directory as a shared tuple of CMUImages"""
+        key = (directory, flipped, size)
+        frames = self.frames.get(key)
+        if frames is not None:
+            self.hits += 1
+            self.bytesSaved += self.frameBytes[key]
+            return frames
+
+        self.misses += 1
+        return self.store(key, self.waitForDecode(key, self.decodeFrames, extensions))
+
+    def getImage(self, path, flipped=False, size=None):
+        """Return a single image file as a shared CMUImage"""
+        key = (path, flipped, size)
+        frames = self.frames.get(key)
+        if frames is not None:
+            self.hits += 1
+            self.bytesSaved += self.frameBytes[key]
+            return frames[0] if frames else None
+
+        self.misses += 1
+        frames = self.store(key, self.waitForDecode(key, self.decodeImage))
+        return frames[0] if frames else None
+
+    def prefetchFrames(self, executor, directory, flipped=False, extensions=('.gif',), size=None):
+        """Start decoding an animation on executor, returns its future"""
+        return self.prefetch(executor, (directory, flipped, size), self.decodeFrames, extensions)
+
+    def prefetchImage(self, executor, path, flipped=False, size=None):
+        return self.prefetch(executor, (path, flipped, size), self.decodeImage)
+
+    def prefetch(self, executor, key, decode, *args):
+        with self.lock:
+            if key in self.frames:
+                return None
+            future = self.inflight.get(key)
+            if future is None:
+                future = executor.submit(decode, key, *args)
+                self.inflight[key] = future
+            return future
+
+    def waitForDecode(self, key, decode, *args):
+        # Reuse a decode already running in the background instead of starting another
+        with self.lock:
+            future = self.inflight.get(key)
+        if future is not None:
+            try:
+                return future.result()
+            except Exception as e:
+                log.error("Error loading sprite %s in the background: %s", key[0], e)
+        return decode(key, *args)
+
+    def wrapPrefetched(self, limit=None):
+        """Wrap finished background decodes into CMUImages, at most limit per call"""
+        with self.lock:
+            done = [(key, future) for key, future in self.inflight.items() if future.done()]
+        for key, future in done[:limit]:
+            try:
+                images = future.result()
+            except Exception as e:
+                # Dropped, so whoever needs it decodes it again on the UI thread
+                log.error("Error loading sprite %s in the background: %s", key[0], e)
+                with self.lock:
+                    self.inflight.pop(key, None)
+                continue
+            self.store(key, images)
+        return len(done[:limit])
+
+    def decodeFrames(self, key, extensions):
+        directory, flipped, size = key
+        if HEADLESS:
+            return [None] * len(listFrameFiles(directory, extensions))
+        atlas = self.getAtlas()
+        if atlas is not None and atlas.hasAnimation(directory, size):
+            with self.lock:
+                return atlas.getFrames(directory, flipped, size)
+        if atlas is not None and atlas.hasAnimation(directory):
+            with self.lock:
+                images = atlas.getFrames(directory, flipped)
+            return [scaleImage(image, size) for image in images]
+
+        paths = [os.path.join(directory, file) for file in listFrameFiles(directory, extensions)]
+        diskKey = f"{directory}|{int(flipped)}|{sizeKey(size)}"
+        images = self.getDiskCache().getFrames(diskKey, paths)
+        if images is None:
+            images = []
+            for path in paths:
+                try:
+                    images.append(self.openImage(path, flipped, size))
+                except Exception as e:
+                    log.error("Error loading sprite %s: %s", path, e)
+            # A frame that failed to decode is tried again next run, not cached missing
+            if len(images) == len(paths):
+                self.getDiskCache().putFrames(diskKey, paths, images)
+        return images
+
+    def decodeImage(self, key):
+        path, flipped, size = key
+        if HEADLESS:
+            return [None]
+        diskKey = f"{path}|{int(flipped)}|{sizeKey(size)}"
+        images = self.getDiskCache().getFrames(diskKey, [path])
+        if images is None:
+            try:
+                images = [self.openImage(path, flipped, size)]
+            except Exception as e:
+                log.error("Error loading sprite %s: %s", path, e)
+                return []
+            self.getDiskCache().putFrames(diskKey, [path], images)
+        return images
+
+    def getAtlas(self):
+        # Looked up once, the first time any animation is requested
+        with self.lock:
+            if not self.atlasChecked:
+                self.atlas = Atlas.load()
+                self.atlasChecked = True
+            return self.atlas
+
+    def getDiskCache(self):
+        with self.lock:
+            if self.diskCache is None:
+                self.diskCache = FrameDiskCache()
+            return self.diskCache
+
+    def saveDiskCache(self):
+        """Persist frames decoded this run so the next launch can skip decoding"""
+        if self.diskCache is not None:
+            self.diskCache.save()
+
+    def openImage(self, path, flipped, size=None):
+        image = Image.open(path)
+        if size is not None:
+            image = scaleImage(image.convert("RGBA"), size)
+        if flipped:
+            image = image.transpose(Image.FLIP_LEFT_RIGHT)
+        return image
+
+    def store(self, key, images):
+        frames = tuple(CMUImage(image) for image in images)
+        with self.lock:
+            # RGBA size of the decoded frames, used to report the memory saved by sharing
+            self.frameBytes[key] = sum(image.width * image.height * 4 for image in images
+                                       if image is not None)
+            self.frames[key] = frames
+            self.inflight.pop(key, None)
+        return frames
+
+    def isLoaded(self, key):
+        return key in self.frames
+
+    def getStats(self):
+        return {
+            "animations": len(self.frames),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytesCached": sum(self.frameBytes.values()),
+            "bytesSaved": self.bytesSaved,
+            "diskCacheHits": self.diskCache.hits if self.diskCache else 0,
+            "diskCacheMisses": self.diskCache.misses if self.diskCache else 0
+        }
+
+    def clear(self):
+        with self.lock:
+            self.atlas = None
+            self.atlasChecked = False
+            self.inflight = {}
+            self.frames = {}
+            self.frameBytes = {}
+            self.hits = 0
+            self.misses = 0
+            self.bytesSaved = 0
+
+# Shared by the whole process
+sprites = SpriteCache()
+atexit.register(sprites.saveDiskCache)
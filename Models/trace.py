@@ -0,0 +1,80 @@
+"""Tick and draw timelines, saved as Chrome trace JSON.
+
+    python main.py --trace
+
+records a span for every onStep, game tick, GameController.update, tick
+pipeline system (the model updates and collision checks) and section of
+the screen GameView draws, in a ring buffer of the last TRACE_SIZE
+spans. Press T to save them to TRACE_DIR; they are also saved when the
+game exits. Open the file in chrome://tracing or https://ui.perfetto.dev
+to see each frame's timeline, e.g. which system a stutter came from.
+
+The spans come from the same timings as the performance overlay (see
+Views/perf_overlay.py): PerfStats hands each one to the tracer as it
+records it. Spans are kept as (series, start, end) tuples and only
+turned into JSON when saved.
+"""
+from collections import deque
+import json
+import os
+import threading
+import time
+
+TRACE_SIZE = 200000  # About 3 minutes of spans at 30 frames per second
+TRACE_DIR = "data/traces"
+
+# Chrome trace rows: spans of series on the same row must nest, so the
+# time between frames gets a row of its own
+TRACKS = {"frame": 2}
+TRACK_NAMES = {1: "game", 2: "frames"}
+
+class Tracer:
+    def __init__(self, size=TRACE_SIZE):
+        self.spans = deque(maxlen=size)
+        self.startTime = time.perf_counter()
+
+    def span(self, series, start, end):
+        self.spans.append((series, start, end))
+
+    def getEvents(self, spans):
+        """spans as Chrome trace events, times in microseconds from startTime"""
+        events = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": track, "args": {"name": name}}
+                  for track, name in TRACK_NAMES.items()]
+        for series, start, end in spans:
+            if isinstance(series, tuple):
+                category, name = series
+            else:
+                category, name = series, series
+            events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((start - self.startTime) * 1e6, 1),
+                "dur": round((end - start) * 1e6, 1),
+                "pid": 1,
+                "tid": TRACKS.get(series, 1)
+            })
+        return events
+
+    def save(self, path=None, background=False):
+        """Write the buffered spans to path (a new file in TRACE_DIR by default).
+
+        With background, the file is written on another thread, so saving
+        while playing does not show up as a stutter in the next trace.
+        Returns the path.
+        """
+        if path is None:
+            path = os.path.join(TRACE_DIR, time.strftime("trace-%Y%m%d-%H%M%S.json"))
+        spans = list(self.spans)
+        if background:
+            threading.Thread(target=self.write, args=(path, spans), daemon=True).start()
+        else:
+            self.write(path, spans)
+        return path
+
+    def write(self, path, spans):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.getEvents(spans), "displayTimeUnit": "ms"}, f)
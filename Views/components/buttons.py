@@ -1,5 +1,5 @@
-from cmu_graphics import drawImage, drawLabel, CMUImage
-from PIL import Image
+from Models.graphics import drawImage, drawLabel
+from Models.sprite_cache import sprites
 
 class KeyButton:
     def __init__(self, key: str, x, y, width=50, height=50):
@@ -8,11 +8,11 @@ class KeyButton:
         self.x = x
         self.y = y
         self.key = key
-        img = Image.open("assets/key.png")
-        self.image = CMUImage(img)
+        self.image = sprites.getImage("assets/key.png", size=(width, height))
 
     def draw(self):
-        drawImage(self.image, self.x, self.y, width=self.width, height=self.height, align='center')
+        if self.image is not None:
+            drawImage(self.image, self.x, self.y, width=self.width, height=self.height, align='center')
         drawLabel(self.key, self.x, self.y, size=self.width * 0.5, fill='black', align='center', bold=True)
 
     
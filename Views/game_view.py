@@ -1,7 +1,13 @@
-from cmu_graphics import *
-from PIL import Image
+from Models.graphics import *
+from Models.base_model import GameObject
+from Models.sprite_cache import sprites
+import Models.database_manager as db
 from Views.components.buttons import KeyButton
-import os
+from Views.perf_overlay import PerfOverlay
+from Models.log import getLogger
+import time
+
+log = getLogger("view")
 
 class GameView:
     def __init__(self, app):
@@ -17,13 +23,11 @@ class GameView:
         self.startScreenTextColor = rgb(255, 255, 255)  # White
         
         # Load background image
-        bgImage = Image.open('assets/bg.jpg')
-        self.backgroundImage = CMUImage(bgImage)
+        self.backgroundImage = sprites.getImage('assets/bg.jpg', size=(app.width, app.height))
         
         # Load fire icon for UI
-        fire_icon_path = 'assets/split_fire/0.gif'  # Using the first fire frame as icon
-        fire_icon = Image.open(fire_icon_path)
-        self.fire_icon = CMUImage(fire_icon)
+        fireFrames = sprites.getFrames('assets/split_fire', size=(40, 35))
+        self.fire_icon = fireFrames[0] if fireFrames else None  # Using the first fire frame as icon
 
         # Level selection buttons
         self.levelButtons = [
@@ -49,6 +53,8 @@ class GameView:
             y = 50 + i * 60
             button = KeyButton(key, x, y)
             self.keyButtons[key] = button
+        
+        self.perfOverlay = PerfOverlay(app)
     
     def drawButton(self, key, x, y, width, height):
         key = self.keyButtons.get(key)
@@ -59,26 +65,45 @@ class GameView:
             key.height = height
             key.draw()
 
+    def drawTimed(self, section, draw):
+        """draw(), timed as a view section for the performance overlay"""
+        if not hasattr(self.app, 'perfStats'):
+            draw()
+            return
+        start = time.perf_counter()
+        draw()
+        self.app.perfStats.add(("view", section), start, time.perf_counter())
+    
     def draw(self):
+        # The overlay is drawn last and left out of the frame's timings
+        if hasattr(self.app, 'perfStats'):
+            frame = self.app.perfStats.startFrame()
+            self.drawScreen()
+            self.app.perfStats.endFrame(frame)
+            self.perfOverlay.draw()
+        else:
+            self.drawScreen()
+    
+    def drawScreen(self):
+        # Draw moving objects part way between the last two ticks
+        if hasattr(self.app, 'gameLoop'):
+            GameObject.renderAlpha = self.app.gameLoop.alpha
+        
         # Draw environment only when not showing special screens
         if not self.app.isStartScreen and not self.app.isLevelComplete and not self.app.isGameOver and not self.app.isControlsScreen:
-            self.model.environment.draw()
+            self.drawTimed("environment", self.model.environment.draw)
             
             # Draw obstacles or enemies based on level
             if self.app.level == 1:
                 # Draw obstacles
-                self.model.obstacleManager.draw()
+                self.drawTimed("obstacles", self.model.obstacleManager.draw)
             else:
                 # Draw enemies - make sure they're drawn in level 2
                 if hasattr(self.model, 'enemyManager'):
-                    self.model.enemyManager.draw()
-                    # Force spawn an enemy if none exist
-                    if len(self.model.enemyManager.enemies) == 0 and self.app.level == 2:
-                        print("No enemies found in level 2! Forcing enemy spawn...")
-                        self.model.enemyManager.spawn_enemy()
+                    self.drawTimed("enemies", self.model.enemyManager.draw)
             
             # Draw the dinosaur
-            self.model.dino.draw()
+            self.drawTimed("dino", self.model.dino.draw)
         
         ##################################
         ##################################
@@ -92,22 +117,25 @@ class GameView:
 
         # Draw UI elements pause, score, level
         if not self.app.isStartScreen and not self.app.isControlsScreen:
-            self.drawUI()
+            self.drawTimed("ui", self.drawUI)
         
         # Draw overlays if needed - draw level complete LAST to ensure it's on top
         if self.app.isStartScreen:
-            self.drawStartScreen()
+            self.drawTimed("start screen", self.drawStartScreen)
         elif self.app.isControlsScreen:
-            self.drawControlsScreen()
+            self.drawTimed("controls screen", self.drawControlsScreen)
         elif self.app.isPaused and not self.app.isGameOver:
-            self.drawPaused()
+            self.drawTimed("paused", self.drawPaused)
         elif self.app.isGameOver:
-            self.drawGameOver()
+            self.drawTimed("game over", self.drawGameOver)
         
         # Always check isLevelComplete flag separately to ensure it gets priority
         if self.app.isLevelComplete:
-            print("Drawing level complete screen")
-            self.drawLevelComplete()
+            log.debug("Drawing level complete screen")
+            self.drawTimed("level complete", self.drawLevelComplete)
+        
+        if hasattr(self.app, 'replayPlayer'):
+            self.drawTimed("replay status", self.drawReplayStatus)
 
     def drawObstacleCounts(self):
         pass
@@ -115,7 +143,7 @@ class GameView:
     def drawStartScreen(self):
         # Draw background image
         if self.backgroundImage:
-            drawImage(self.backgroundImage, 0, 0, width=self.model.width, height=self.model.height)
+            drawImage(self.backgroundImage, 0, 0)
         else:
             # draw to rectangle if image not available
             drawRect(0, 0, self.model.width, self.model.height, fill="black", opacity=80)
@@ -154,11 +182,50 @@ class GameView:
         # Single instruction at the bottom
         drawLabel("Press ENTER to start", self.model.width//2, 
                  self.model.height - 50, size=18, fill=self.startScreenTextColor)
+        
+        self.drawRanking()
+        
+        # Asset loading progress
+        if not self.app.preloader.isFinished:
+            self.drawLoadingProgress()
+    
+    def drawRanking(self):
+        """Top scores and the player's standing for the selected level"""
+        ranking = db.get_ranking_store()
+        level = self.app.selectedLevel
+        x = 30
+        y = self.model.height//2 - 20
+        
+        drawLabel("TOP SCORES", x, y, size=16, fill=self.startScreenTextColor,
+                 align='left', bold=True)
+        for i, (player, score) in enumerate(ranking.top_scores(level)):
+            drawLabel(f"{i + 1}. {player}  {score}", x, y + 25 + i * 20, size=14,
+                     fill=self.startScreenTextColor, align='left')
+        
+        rank = ranking.player_rank(self.model.playerName, level)
+        if rank is not None:
+            best = ranking.personal_best(self.model.playerName, level)
+            drawLabel(f"You: #{rank}, best {best}", x, y + 140, size=14,
+                     fill=self.startScreenTextColor, align='left', bold=True)
+    
+    def drawLoadingProgress(self):
+        progress = self.app.preloader.getProgress()
+        barWidth = 200
+        barHeight = 8
+        barX = self.model.width//2 - barWidth//2
+        barY = self.model.height - 25
+        
+        drawRect(barX, barY, barWidth, barHeight, fill=rgb(40, 40, 140))
+        if progress > 0:
+            drawRect(barX, barY, barWidth * progress, barHeight, fill=self.startScreenTextColor)
+        
+        text = "Loading..." if self.app.isWaitingForAssets else f"Loading assets {int(progress * 100)}%"
+        drawLabel(text, self.model.width//2, barY - 10, size=12, fill=self.startScreenTextColor)
     
     def drawControlsScreen(self):
         # Draw background image
         if self.backgroundImage:
-            drawImage(self.backgroundImage, 0, 0, width=self.model.width, height=self.model.height)
+            drawImage(self.backgroundImage, 0, 0)
         
         drawRect(0, 0, self.model.width, self.model.height, fill="black", opacity=70)
 
@@ -198,7 +265,25 @@ class GameView:
                 fill=rgb(40, 40, 140), border='white', borderWidth=2)
         drawLabel("Back to Menu", self.model.width//2, backButtonY, 
                 fill='white', size=14)
+        
+        if not self.app.preloader.isFinished:
+            self.drawLoadingProgress()
     
+    def drawReplayStatus(self):
+        """Playback position and speed, with the playback keys"""
+        player = self.app.replayPlayer
+        if player.isFinished():
+            status = "REPLAY finished"
+        else:
+            status = f"REPLAY {player.speed}x"
+        # Ticks run at 30 per second
+        status += f"  {player.runTick / 30:.1f}s / {player.replay.ticks / 30:.1f}s"
+        drawLabel(status, self.model.width//2, self.model.height - 50, size=16,
+                  fill=self.textColor, align='center', bold=True)
+        drawLabel("1/2/3: speed 1x/4x/16x   left/right: seek 10s",
+                  self.model.width//2, self.model.height - 30, size=12,
+                  fill=self.textColor, align='center')
+
     def drawUI(self):
         # Score
         drawLabel(self.model.getScoreText(), 
@@ -225,7 +310,8 @@ class GameView:
         count_y = 60
         
         # Draw fire icon
-        drawImage(self.fire_icon, icon_x, icon_y, width=40, height=35, align='center')
+        if self.fire_icon is not None:
+            drawImage(self.fire_icon, icon_x, icon_y, align='center')
 
         # Draw count - show "∞" for unlimited in level 2
         if self.app.level == 2:
@@ -243,7 +329,7 @@ class GameView:
     def drawPaused(self):
         # Draw background
         if self.backgroundImage:
-            drawImage(self.backgroundImage, 0, 0, width=self.model.width, height=self.model.height, opacity=70)
+            drawImage(self.backgroundImage, 0, 0, opacity=70)
         else:
             drawRect(0, 0, self.model.width, self.model.height, fill='black', opacity=50)
         
@@ -258,7 +344,7 @@ class GameView:
     def drawGameOver(self):
         # Draw background
         if self.backgroundImage:
-            drawImage(self.backgroundImage, 0, 0, width=self.app.width, height=self.app.height)
+            drawImage(self.backgroundImage, 0, 0)
             drawRect(0, 0, self.app.width, self.app.height, fill='red', opacity=60)
         else:
             drawRect(0, 0, self.app.width, self.app.height, fill='black', opacity=70)
@@ -280,7 +366,7 @@ class GameView:
     def drawLevelComplete(self):
         # Draw background
         if self.backgroundImage:
-            drawImage(self.backgroundImage, 0, 0, width=self.app.width, height=self.app.height)
+            drawImage(self.backgroundImage, 0, 0)
             drawRect(0, 0, self.app.width, self.app.height, fill='green', opacity=30)
         else:
             drawRect(0, 0, self.app.width, self.app.height, fill='darkgreen')
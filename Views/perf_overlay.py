@@ -0,0 +1,147 @@
+"""Performance overlay: frame rate, tick and draw times, per system.
+
+Press P in the window to show or hide it. While the game runs, the tick
+pipeline times every system it runs (see Controllers/tick_pipeline.py)
+and the view times each part of the screen it draws, into a PerfStats
+kept on the app. Recording a sample is one perf_counter() call and a
+deque append; the percentiles are only worked out when the overlay
+refreshes its text, every REFRESH_FRAMES frames while it is showing. The
+overlay's own drawing comes after the frame's draw time and draw calls
+are taken, so it does not show up in them.
+
+With a tracer set (python main.py --trace, see Models/trace.py), every
+sample is also handed to it as a span.
+"""
+from collections import deque
+from Models.graphics import drawCounts, drawLabel, drawRect, rgb
+import time
+
+SAMPLES = 300  # Per series: 10 seconds of ticks or frames
+REFRESH_FRAMES = 15
+PERCENTILES = (50, 95, 99)
+NAME_WIDTH = 30
+
+class PerfStats:
+    """The last SAMPLES timings (in seconds) of each series.
+
+    Series are "frame" (time between frames), "step" (one onStep),
+    "tick" (one game tick), "update" (GameController.update), "draw"
+    (one GameView.draw), (stage, system) for tick pipeline systems and
+    ("view", section) for parts of the screen.
+    """
+    def __init__(self, size=SAMPLES):
+        self.size = size
+        self.samples = {}
+        self.drawCalls = deque(maxlen=size)  # Per frame: {function: calls}
+        self.lastFrame = None
+        self.tracer = None
+
+    def add(self, series, start, end):
+        """Record that series took from start to end (perf_counter() times)"""
+        samples = self.samples.get(series)
+        if samples is None:
+            samples = self.samples[series] = deque(maxlen=self.size)
+        samples.append(end - start)
+        if self.tracer is not None:
+            self.tracer.span(series, start, end)
+
+    def startFrame(self):
+        """Called as a frame starts drawing; returns what endFrame needs"""
+        now = time.perf_counter()
+        if self.lastFrame is not None:
+            self.add("frame", self.lastFrame, now)
+        self.lastFrame = now
+        return now, dict(drawCounts)
+
+    def endFrame(self, frame):
+        start, countsBefore = frame
+        self.add("draw", start, time.perf_counter())
+        self.drawCalls.append({name: drawCounts[name] - countsBefore[name] for name in drawCounts})
+
+    def percentiles(self, series):
+        """Nearest-rank PERCENTILES of series in seconds, or None without samples"""
+        samples = sorted(self.samples.get(series, ()))
+        if not samples:
+            return None
+        return [samples[min(len(samples) - 1, len(samples) * p // 100)] for p in PERCENTILES]
+
+    def framesPerSecond(self):
+        frames = self.samples.get("frame")
+        if not frames:
+            return 0
+        return len(frames) / sum(frames)
+
+class PerfOverlay:
+    def __init__(self, app):
+        self.app = app
+        self.isVisible = False
+        self.lines = []
+        self.framesUntilRefresh = 0
+
+        self.backgroundColor = rgb(0, 0, 0)
+        self.textColor = rgb(120, 255, 120)
+
+    def toggle(self):
+        self.isVisible = not self.isVisible
+        self.framesUntilRefresh = 0
+
+    def draw(self):
+        if not self.isVisible or not hasattr(self.app, 'perfStats'):
+            return
+        if self.framesUntilRefresh <= 0:
+            self.lines = self.getLines()
+            self.framesUntilRefresh = REFRESH_FRAMES
+        self.framesUntilRefresh -= 1
+
+        lineHeight = 13
+        drawRect(5, 45, 400, len(self.lines) * lineHeight + 10, fill=self.backgroundColor, opacity=60)
+        for i, line in enumerate(self.lines):
+            drawLabel(line, 12, 55 + i * lineHeight, size=11, fill=self.textColor,
+                      align='left', font='monospace')
+
+    def getLines(self):
+        stats = self.app.perfStats
+        fps = f"FPS {stats.framesPerSecond():.1f}"
+        lines = [f"{fps:{NAME_WIDTH}}" + "".join(f"{f'p{p}':>8}" for p in PERCENTILES) + " ms"]
+        lines += self.getTimingLines(stats, ["tick", "draw"])
+
+        # Systems in the order they first ran, then the parts of the screen
+        systems = [series for series in stats.samples if isinstance(series, tuple) and series[0] != "view"]
+        sections = [series for series in stats.samples if isinstance(series, tuple) and series[0] == "view"]
+        if systems:
+            lines.append("tick systems")
+            lines += self.getTimingLines(stats, systems)
+        if sections:
+            lines.append("view sections")
+            lines += self.getTimingLines(stats, sections)
+
+        model = self.app.model
+        fires = len(model.dino.active_fires)
+        for enemy in model.enemyManager.enemies:
+            fires += len(enemy.active_fires)
+        lines.append(f"obstacles {len(model.obstacleManager.obstacles)}  fires {fires}  "
+                     f"enemies {len(model.enemyManager.enemies)}")
+
+        if stats.drawCalls:
+            lastFrame = stats.drawCalls[-1]
+            perFrame = sorted(sum(frame.values()) for frame in stats.drawCalls)
+            # drawImage -> "image"
+            kinds = ", ".join(f"{calls} {name[4:].lower()}" for name, calls in lastFrame.items() if calls)
+            lines.append(f"draw calls {sum(lastFrame.values())} (p95 {perFrame[len(perFrame) * 95 // 100]}): "
+                         f"{kinds}")
+        return lines
+
+    def getTimingLines(self, stats, seriesList):
+        lines = []
+        for series in seriesList:
+            times = stats.percentiles(series)
+            if times is None:
+                continue
+            if isinstance(series, str):
+                name = series
+            elif series[0] == "view":
+                name = f"  {series[1]}"
+            else:
+                name = f"  {series[0]}: {series[1]}"
+            lines.append(f"{name[:NAME_WIDTH]:{NAME_WIDTH}}" + "".join(f"{t * 1000:8.2f}" for t in times))
+        return lines
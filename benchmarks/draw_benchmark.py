@@ -0,0 +1,58 @@
+"""Compare per-frame draw cost of scaling frames at draw time vs blitting
+frames pre-scaled to their on-screen size.
+
+    python -m benchmarks.draw_benchmark
+
+cmu_graphics needs a window to draw, so this composites the same frames
+onto an 800x600 PIL canvas: "before" resamples every source frame to its
+draw size each frame (what drawImage(width=, height=) costs), "after"
+blits the frames produced by the asset layer.
+"""
+from Models.atlas import listFrameFiles, scaleImage
+from PIL import Image
+import os
+import time
+
+CANVAS_SIZE = (800, 600)
+
+# (animation, file types, on-screen size, instances drawn per frame)
+SCENE = [
+    ("assets/dino/walking", (".gif",), (70, 70), 1),
+    ("assets/bird/flying", (".gif",), (60, 50), 2),
+    ("assets/cactus", (".png", ".gif"), (60, 60), 2),
+    ("assets/wifi_meteor", (".gif",), (45, 70), 1),
+    ("assets/split_fire", (".gif",), (60, 40), 3),
+]
+GROUND = ("assets/ground.png", (800, 40), 2)
+
+def loadSource(directory, extensions):
+    file = listFrameFiles(directory, extensions)[0]
+    return Image.open(os.path.join(directory, file)).convert("RGBA")
+
+def drawFrame(canvas, sprites, prescaled):
+    for source, size, count in sprites:
+        for i in range(count):
+            image = source if prescaled else source.resize(size, Image.LANCZOS)
+            x = min(i * 90, CANVAS_SIZE[0] - size[0])
+            canvas.alpha_composite(image, (x, CANVAS_SIZE[1] - size[1]))
+
+def timeFrames(sprites, prescaled, frames):
+    canvas = Image.new("RGBA", CANVAS_SIZE)
+    start = time.perf_counter()
+    for _ in range(frames):
+        drawFrame(canvas, sprites, prescaled)
+    return (time.perf_counter() - start) / frames * 1000
+
+def main(frames=200):
+    ground = Image.open(GROUND[0]).convert("RGBA")
+    sources = [(loadSource(d, ext), size, count) for d, ext, size, count in SCENE]
+    sources.append((ground, GROUND[1], GROUND[2]))
+    scaled = [(scaleImage(source, size), size, count) for source, size, count in sources]
+
+    before = timeFrames(sources, False, frames)
+    after = timeFrames(scaled, True, frames)
+    print(f"scale on draw: {before:.3f} ms/frame")
+    print(f"pre-scaled:    {after:.3f} ms/frame ({before / after:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
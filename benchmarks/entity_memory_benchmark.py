@@ -0,0 +1,61 @@
+"""Memory per entity and cost of updating entities.
+
+    python -m benchmarks.entity_memory_benchmark
+
+For every kind of game object this builds COUNT of them with tracemalloc
+running and reports the bytes each one holds on its own (shared animation
+frames are loaded beforehand, so they are not counted), then times
+update() over all of them, which is mostly attribute reads and writes.
+"""
+import os
+
+os.environ["DINO_HEADLESS"] = "1"
+
+from Controllers.headless import createApp, quiet
+from Models.dino import Dino
+from Models.enemy_dino import EnemyDino
+from Models.fire import Fire
+from Models.obstacles import Bird, Cactus, WiFiMeteor
+import time
+import tracemalloc
+
+COUNT = 1000
+
+def makers(app):
+    return {
+        "Fire": lambda i: Fire(i % 800, 300, direction=1, speed=16, distance=10 ** 9),
+        "Cactus": lambda i: Cactus(i % 800, 510, 60, 60, 6, rng=app.rng.stream("cosmetics")),
+        "Bird": lambda i: Bird(i % 800, 490, 60, 50, 7),
+        "WiFiMeteor": lambda i: WiFiMeteor(300 + i % 500, 0, app, 45, 70, 8.4),
+        "Dino": lambda i: Dino(app, 100, 500),
+        "EnemyDino": lambda i: EnemyDino(app, 640, 500)
+    }
+
+def measureBytes(make):
+    make(0)  # load the shared frames first
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [make(i) for i in range(COUNT)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / COUNT, entities
+
+def timeUpdates(entities, ticks):
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for entity in entities:
+            entity.update()
+    return (time.perf_counter() - start) / (ticks * len(entities)) * 1e6
+
+def main(ticks=50):
+    with quiet(False):
+        app = createApp(1, seed=1)
+    for name, make in makers(app).items():
+        # Enemies print as they are made and as they move
+        with quiet(False):
+            perEntity, entities = measureBytes(make)
+            perUpdate = timeUpdates(entities, ticks)
+        print(f"{name:11} {perEntity:7.0f} bytes each, update {perUpdate:5.2f} us")
+
+if __name__ == "__main__":
+    main()
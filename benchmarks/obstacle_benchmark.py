@@ -0,0 +1,63 @@
+"""Per-tick cost of the obstacle backends with thousands of live obstacles.
+
+    python -m benchmarks.obstacle_benchmark
+
+Fills an ObstacleManager (one object per obstacle) and an
+ArrayObstacleManager (NumPy rows) with the same mix of cacti, birds and
+meteors, then times what they do every tick: save positions for drawing,
+move, and count and remove the obstacles that left the screen. Obstacles
+that leave are replaced at the right edge so the count stays the same.
+"""
+import os
+
+os.environ["DINO_HEADLESS"] = "1"
+
+from Controllers.headless import HeadlessApp, quiet
+from Models.obstacles import ObstacleManager
+from Models.obstacles.obstacle_arrays import ArrayObstacleManager
+from Models.rng import RngService
+import time
+
+COUNTS = (100, 1000, 5000, 20000)
+TICK_BUDGET_MS = 1000 / 30
+
+def addRandom(manager, rng, x=None):
+    obstacleType = rng.choice(("cactus", "bird", "meteor"))
+    if x is None:
+        x = rng.uniform(0, manager.width * 4)
+    if obstacleType == "meteor":
+        manager.addObstacle("meteor", x, rng.uniform(0, manager.groundY - 70), 45, 70, 8.4)
+    elif obstacleType == "bird":
+        manager.addObstacle("bird", x, manager.groundY - 80, 60, 50, 7)
+    else:
+        manager.addObstacle("cactus", x, manager.groundY - 60, 60, 60, 6)
+
+def timeTicks(managerType, count, ticks):
+    app = HeadlessApp(1)
+    app.rng = RngService(1)
+    manager = managerType(app)
+    rng = app.rng.stream("spawns")
+    for _ in range(count):
+        addRandom(manager, rng)
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        manager.savePositions()
+        manager.updateObstacles()
+        manager.retireObstacles()
+        for _ in range(count - len(manager.obstacles)):
+            addRandom(manager, rng, manager.width + 20)
+    return (time.perf_counter() - start) / ticks * 1000
+
+def main(ticks=200):
+    print(f"tick budget at 30 ticks/s: {TICK_BUDGET_MS:.1f} ms")
+    for count in COUNTS:
+        # Both print a line for every obstacle that passes
+        with quiet(False):
+            objects = timeTicks(ObstacleManager, count, ticks)
+            arrays = timeTicks(ArrayObstacleManager, count, ticks)
+        print(f"{count:6} obstacles: objects {objects:7.3f} ms/tick, "
+              f"arrays {arrays:7.3f} ms/tick ({objects / arrays:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,31 @@
+import os
+import sys
+
+# Headless runs have to be set up before any model imports Models.graphics,
+# and never import cmu_graphics at all
+if __name__ == '__main__' and '--headless' in sys.argv[1:]:
+    os.environ["DINO_HEADLESS"] = "1"
+    from Controllers.headless import main as runHeadless
+    sys.exit(runHeadless(sys.argv[1:]))
+
 from cmu_graphics import *
+import argparse
+import atexit
+import time
+from Models.asset_preloader import AssetPreloader
 from Models.game_model import GameModelManager
-from Controllers.game_controller import GameController
+from Models.log import DUMP_FILE, gameLog
+from Models.rng import RngService
+from Models.settings_watcher import SettingsWatcher
+from Models.trace import Tracer
+from Controllers.game_controller import GameController, PERF_OVERLAY_KEY
+from Controllers.game_loop import FixedTimestepLoop
+from Controllers.replay import Replay, ReplayPlayer, ReplayRecorder, REPLAY_SPEEDS, KEYFRAME_INTERVAL
 from Views.game_view import GameView
+from Views.perf_overlay import PerfStats
+
+# Command line options, set by main() (see --replay)
+launchOptions = None
 
 def onAppStart(app):
     app.timer = 0
@@ -17,11 +41,44 @@ def onAppStart(app):
     app.selectedLevel = 1
 
     app.groundY = app.height - 30
+    app.obstacleBackend = launchOptions.obstacles if launchOptions is not None else "objects"
     
-    # Create models, views and controllers after setting up game state
-    app.model = GameModelManager(app)
-    app.controller = GameController(app)
-    app.view = GameView(app)
+    # Every random choice in the game comes from here (see Models/rng.py)
+    app.rng = RngService()
+    
+    # Either record every run, or play a recorded one back (see Controllers/replay.py)
+    if launchOptions is not None and launchOptions.replay:
+        app.replayPlayer = ReplayPlayer(app, Replay.load(launchOptions.replay))
+        app.replayPlayer.setSpeed(launchOptions.speed)
+        app.selectedLevel = app.replayPlayer.replay.level
+    else:
+        app.replayRecorder = ReplayRecorder()
+        atexit.register(lambda: hasattr(app, 'controller') and
+                        app.replayRecorder.finish(app.controller.tickCount))
+    
+    # Decode sprites in the background. The game is built once the sprites
+    # every level needs are ready (see createGame), so the window shows a
+    # loading screen instead of blocking on them; level sprites keep
+    # loading while the start screen is up.
+    app.preloader = AssetPreloader(app)
+    app.preloader.start()
+    app.isWaitingForAssets = False
+    
+    # Pick up edits to the level and battle CSVs while the game runs
+    app.settingsWatcher = SettingsWatcher()
+    app.settingsWatcher.start()
+    
+    # Tick and draw timings for the performance overlay (P)
+    app.perfStats = PerfStats()
+    
+    # Timelines of the same timings for chrome://tracing (T saves, see Models/trace.py)
+    if launchOptions is not None and launchOptions.trace:
+        app.tracer = Tracer()
+        app.perfStats.tracer = app.tracer
+        atexit.register(app.tracer.save)
+    
+    # Frame rate; the simulation runs at TICK_RATE whatever this is set to
+    app.stepsPerSecond = 30
 
     # Set up sounds
     app.themeMusic = Sound("assets/theme.mp3")
@@ -35,36 +92,69 @@ def onAppStart(app):
     # Define initNewGame as a method to the app
     def initNewGame():
         """Initialize a new game with the selected level"""
-        app.isControlsScreen = False
-        app.isStartScreen = False
-        app.isPaused = False
-        app.isGameOver = False
-        app.isLevelComplete = False
-        
-        # Set the level from selection
-        app.level = app.selectedLevel
-        
-        # Update obstacle manager for the selected level
-        if hasattr(app.model, 'obstacleManager'):
-            app.model.obstacleManager.updateLevel(app.level)
-        
-        # Reset enemy manager if in battle mode
-        if app.level == 2 and hasattr(app.model, 'enemyManager'):
-            app.model.enemyManager.reset_enemies()
-        
-        # Ensure dino is in running state
-        if hasattr(app.model, 'dino'):
-            app.model.dino.isRunning = True
-            app.model.dino.isIdle = False
-            app.model.dino.health = app.model.dino.maxHealth  # Reset health
-
-        # Reset score
-        app.model.score = 0
+        # Start once the selected level's sprites are decoded (see onStep)
+        if not app.preloader.isReady(app.selectedLevel):
+            app.isWaitingForAssets = True
+            return
+        app.isWaitingForAssets = False
+        app.controller.gameFlowController.startGame()
     
     # Bind the function to the app object
     app.initNewGame = initNewGame
 
+def createGame(app):
+    """Create models, views and controllers, once the sprites they use are decoded"""
+    app.model = GameModelManager(app)
+    app.controller = GameController(app)
+    app.view = GameView(app)
+    
+    if hasattr(app, 'replayPlayer'):
+        app.gameLoop = FixedTimestepLoop(app.replayPlayer.tick)
+    else:
+        app.gameLoop = FixedTimestepLoop(app.controller.tick)
+
+def drawLoadingScreen(app):
+    """Shown until createGame runs; uses no sprites, so it never waits on decoding"""
+    drawRect(0, 0, app.width, app.height, fill=rgb(25, 25, 112))
+    drawLabel("Dino Runner", app.width//2, app.height//2 - 100, size=50, fill="white", bold=True)
+    barWidth = 200
+    progress = app.preloader.getProgress()
+    drawRect(app.width//2 - barWidth//2, app.height//2, barWidth, 8, fill=rgb(40, 40, 140))
+    if progress > 0:
+        drawRect(app.width//2 - barWidth//2, app.height//2, barWidth * progress, 8, fill="white")
+    drawLabel(f"Loading assets {int(progress * 100)}%", app.width//2, app.height//2 - 10,
+              size=12, fill="white")
+
+def handleReplayKey(app, key):
+    """While replaying, 1/2/3 set the speed, left/right seek and P shows timings; the game gets no input"""
+    player = app.replayPlayer
+    if key in ('1', '2', '3'):
+        player.setSpeed(REPLAY_SPEEDS[int(key) - 1])
+    elif key == 'left':
+        player.seek(player.runTick - KEYFRAME_INTERVAL)
+    elif key == 'right':
+        player.seek(player.runTick + KEYFRAME_INTERVAL)
+    elif key == PERF_OVERLAY_KEY:
+        app.controller.togglePerfOverlay()
+
 def onKeyPress(app, key):
+    if not hasattr(app, 'controller'):
+        return
+    
+    # Save the recent log, for bug reports (see Models/log.py)
+    if key == 'l':
+        gameLog.dump(DUMP_FILE)
+        print(f"Log written to {DUMP_FILE}")
+        return
+    
+    if key == 't' and hasattr(app, 'tracer'):
+        print(f"Trace written to {app.tracer.save(background=True)}")
+        return
+    
+    if hasattr(app, 'replayPlayer'):
+        handleReplayKey(app, key)
+        return
+    
     # Handle back key from controls screen
     if app.isControlsScreen and key == 'escape':
         app.isControlsScreen = False
@@ -74,12 +164,19 @@ def onKeyPress(app, key):
     app.controller.handleKeyPress(key)
 
 def onKeyHold(app, keys):
+    if hasattr(app, 'replayPlayer') or not hasattr(app, 'controller'):
+        return
     app.controller.handleKeyHold(keys)
 
 def onKeyRelease(app, key):
+    if hasattr(app, 'replayPlayer') or not hasattr(app, 'controller'):
+        return
     app.controller.handleKeyRelease(key)
 
 def onMousePress(app, mouseX, mouseY):
+    if hasattr(app, 'replayPlayer') or not hasattr(app, 'controller'):
+        return
+    
     # Handle mouse press for buttons on start screen
     if app.isStartScreen:
         # Check for level selection buttons
@@ -139,24 +236,48 @@ def onMousePress(app, mouseX, mouseY):
     app.controller.handleMousePress(mouseX, mouseY)
 
 def onMouseRelease(app, mouseX, mouseY):
+    if not hasattr(app, 'controller'):
+        return
     app.controller.handleMouseRelease(mouseX, mouseY)
 
 def onStep(app):
-    # Update timer based on game state
-    if app.isStartScreen or app.isPaused or app.isGameOver or app.isLevelComplete or app.isControlsScreen:
-        # Update timer at a reduced rate for smoother animations when not active
-        if app.timer % 3 == 0:
-            app.timer += 1
-    else:
-        app.timer += 1
+    start = time.perf_counter()
+    app.preloader.update()
+    if not hasattr(app, 'controller'):
+        # Build the game once the sprites every level needs (level None) are decoded
+        if not app.preloader.isReady(None):
+            return
+        createGame(app)
+    
+    if app.isWaitingForAssets and app.preloader.isReady(app.selectedLevel):
+        app.initNewGame()
     
-    if not app.isLevelComplete:
-        app.controller.update()
+    # Replays start as soon as the recorded level's sprites are ready
+    if (hasattr(app, 'replayPlayer') and not app.replayPlayer.isStarted and
+            app.preloader.isReady(app.selectedLevel)):
+        app.replayPlayer.start()
+    
+    # Run however many fixed-rate ticks are due; drawing interpolates between them
+    app.gameLoop.advance()
+    app.perfStats.add("step", start, time.perf_counter())
 
 def redrawAll(app):
+    if not hasattr(app, 'view'):
+        drawLoadingScreen(app)
+        return
     app.view.draw()
 
 def main():
+    global launchOptions
+    parser = argparse.ArgumentParser(description="Dino runner")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recorded run")
+    parser.add_argument("--speed", type=int, default=1, choices=REPLAY_SPEEDS,
+                        help="replay speed (1, 2 and 3 change it while playing)")
+    parser.add_argument("--obstacles", default="objects", choices=("objects", "arrays"),
+                        help="obstacle storage: one object each, or NumPy arrays")
+    parser.add_argument("--trace", action="store_true",
+                        help="record tick and draw timelines (T or exiting saves them to data/traces/)")
+    launchOptions = parser.parse_args()
     runApp(800, 600)
 
 if __name__ == '__main__':